@@ -0,0 +1,132 @@
+# benchmarks/bench_image_processing.py
+"""Per-frame cost of ImageProcessor renders with and without cached layers.
+
+"before" clears the template layer and glyph fallback caches ahead of every
+render and every avatar frame, which reproduces the old behaviour of
+rebuilding the misty layer, border overlay, circular mask and drop shadow
+(and probing fonts per glyph) each time. "after" keeps them warm.
+
+    python benchmarks/bench_image_processing.py --frames 24 --runs 5
+"""
+
+import argparse
+import io
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PIL import Image  # noqa: E402
+
+from bot.utils import image_processing  # noqa: E402
+from bot.utils.image_processing import (  # noqa: E402
+    AVATAR_BORDER_WIDTH,
+    AVATAR_TARGET_SIZE,
+    ImageProcessor,
+    clear_layer_caches,
+)
+
+
+def synthetic_gif(size: tuple[int, int], frames: int) -> bytes:
+    base = Image.linear_gradient("L").resize(size)
+    images = [
+        Image.merge("RGB", (base.rotate(i * 15), base, base.rotate(-i * 15)))
+        for i in range(frames)
+    ]
+    buffer = io.BytesIO()
+    images[0].save(
+        buffer, format="GIF", save_all=True, append_images=images[1:], duration=60
+    )
+    return buffer.getvalue()
+
+
+def time_round_avatar(processor, frame, runs: int, cold: bool) -> float:
+    samples = []
+    for _ in range(runs):
+        if cold:
+            clear_layer_caches()
+        started = time.perf_counter()
+        processor.round_avatar(frame, AVATAR_TARGET_SIZE, AVATAR_BORDER_WIDTH)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def time_render(processor, banner, avatar, frames: int, runs: int, cold: bool):
+    original_round_avatar = ImageProcessor.round_avatar
+
+    def round_avatar_cold(self, *args, **kwargs):
+        clear_layer_caches()
+        return original_round_avatar(self, *args, **kwargs)
+
+    samples = []
+    if cold:
+        ImageProcessor.round_avatar = round_avatar_cold
+    try:
+        for _ in range(runs):
+            if cold:
+                clear_layer_caches()
+            started = time.perf_counter()
+            output = processor.process_image_sync(
+                io.BytesIO(banner),
+                io.BytesIO(avatar),
+                "ベンチマーク",
+                "benchmark",
+                "0",
+                "2024/01/01 00:00",
+                True,
+            )
+            samples.append(time.perf_counter() - started)
+            assert output is not None
+    finally:
+        ImageProcessor.round_avatar = original_round_avatar
+    return statistics.median(samples) / frames
+
+
+def main(args):
+    logging.disable(logging.ERROR)
+    processor = ImageProcessor()
+    banner = synthetic_gif((680, 272), args.frames)
+    avatar = synthetic_gif((256, 256), args.frames)
+    avatar_frame = Image.open(io.BytesIO(avatar)).convert("RGBA")
+
+    print(f"frames={args.frames} runs={args.runs}")
+    print(f"{'stage':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    rows = [
+        (
+            "round_avatar / frame",
+            time_round_avatar(processor, avatar_frame, args.runs * 10, cold=True),
+            time_round_avatar(processor, avatar_frame, args.runs * 10, cold=False),
+        ),
+        (
+            "GIF render / frame",
+            time_render(processor, banner, avatar, args.frames, args.runs, cold=True),
+            time_render(processor, banner, avatar, args.frames, args.runs, cold=False),
+        ),
+    ]
+    for stage, before, after in rows:
+        print(
+            f"{stage:<28}{before * 1000:>12.2f}{after * 1000:>12.2f}"
+            f"{before / after:>9.2f}x"
+        )
+    print(
+        "cached layers:",
+        {
+            name: getattr(image_processing, name).cache_info().currsize
+            for name in (
+                "misty_layer",
+                "border_overlay",
+                "circle_mask",
+                "avatar_shadow_canvas",
+            )
+        },
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=24)
+    parser.add_argument("--runs", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,237 @@
+# benchmarks/bench_link_fixer.py
+"""Replay a synthetic chat corpus through LinkFixer.on_message.
+
+Runs fully offline: Discord objects are small fakes and guild configs come
+from an in-memory store patched over get_guild_data, so the numbers cover
+only the cog's own work (prefilter, config slice, rewrite, queueing).
+
+    python benchmarks/bench_link_fixer.py --messages 20000 --mode webhook
+"""
+
+import argparse
+import asyncio
+import copy
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("MONGO_DB_NAME", "benchmark")
+
+from bot.cogs import link_fixer  # noqa: E402
+from bot.utils.database import DEFAULT_CONFIG  # noqa: E402
+from bot.utils.repost_queue import RepostQueue  # noqa: E402
+
+CHAT = [
+    "早安大家",
+    "lol that's wild",
+    "有人要一起打遊戲嗎？",
+    "brb getting food",
+    "ok sounds good, see you at 8",
+    "這個更新到底改了什麼",
+]
+UNICODE = [
+    "🌸🌸🌸 さくらが咲いた！今日は花見に行こう 🍡🍵",
+    "Ｆｕｌｌｗｉｄｔｈ　ｔｅｘｔ　ａｎｄ　ｅｍｏｊｉ 🎉🎊✨",
+    "Ελληνικά, русский, العربية, हिन्दी — all in one line 🌍",
+    "ｗｗｗｗｗ 草生える 🤣🤣🤣 http は含まない",
+]
+LINKS = [
+    "https://x.com/user/status/1790000000000000000?s=20",
+    "https://twitter.com/user/status/1790000000000000001",
+    "https://www.instagram.com/reel/C7abcdEFgh/?igsh=MWQ1ZGUxMzBkMA==",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&si=abc",
+    "https://old.reddit.com/r/python/comments/abc123/title/",
+    "https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC?si=xyz",
+    "https://www.tiktok.com/@user/video/7300000000000000000",
+    "https://example.com/not/a/platform",
+    "https://github.com/FxEmbed/FxEmbed",
+]
+
+
+class FakeWebhook:
+    name = link_fixer.WEBHOOK_NAME
+
+    async def send(self, **kwargs):
+        return None
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, guild):
+        self.id = channel_id
+        self.guild = guild
+        self.webhook = None
+
+    async def webhooks(self):
+        return [self.webhook] if self.webhook else []
+
+    async def create_webhook(self, name: str):
+        self.webhook = FakeWebhook()
+        return self.webhook
+
+
+class FakeMessage:
+    def __init__(self, content: str, author, channel):
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+
+    async def delete(self):
+        return None
+
+    async def edit(self, **kwargs):
+        return None
+
+    async def reply(self, content: str, **kwargs):
+        return None
+
+
+def build_corpus(count: int, guilds: int, seed: int) -> list[tuple[str, FakeMessage]]:
+    rng = random.Random(seed)
+    author = SimpleNamespace(
+        bot=False,
+        display_name="bench",
+        display_avatar=SimpleNamespace(url="https://cdn.example/avatar.png"),
+    )
+    channels = [
+        FakeChannel(10_000 + i, SimpleNamespace(id=i)) for i in range(1, guilds + 1)
+    ]
+    kinds = ["chat", "unicode", "single_link", "many_links"]
+    weights = [70, 15, 12, 3]
+    corpus = []
+    for _ in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "chat":
+            content = rng.choice(CHAT)
+        elif kind == "unicode":
+            content = rng.choice(UNICODE) * rng.randint(1, 4)
+        elif kind == "single_link":
+            content = f"{rng.choice(CHAT)} {rng.choice(LINKS)}"
+        else:
+            content = " ".join(rng.choice(LINKS) for _ in range(rng.randint(4, 10)))
+        corpus.append((kind, FakeMessage(content, author, rng.choice(channels))))
+    return corpus
+
+
+def install_config_store(guilds: int, mode: str, disabled_ratio: float):
+    """Patch get_guild_data in the cog module with an in-memory store."""
+    store = {}
+    for guild_id in range(1, guilds + 1):
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        config["guild_id"] = guild_id
+        config["link_fix_mode"] = mode
+        config["auto_link_fix"] = guild_id > guilds * disabled_ratio
+        store[guild_id] = config
+
+    async def get_guild_data(guild_id: int, fields=None):
+        config = store[guild_id]
+        if fields is None:
+            return config
+        return {field: config[field] for field in fields if field in config}
+
+    link_fixer.get_guild_data = get_guild_data
+
+
+def percentile(values: list[int], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] / 1000
+
+
+async def timed_pass(cog, corpus) -> tuple[dict, float]:
+    latencies = defaultdict(list)
+    started = time.perf_counter()
+    for kind, message in corpus:
+        t0 = time.perf_counter_ns()
+        await cog.on_message(message)
+        latencies[kind].append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - started
+    await cog.repost_queue.close()
+    return latencies, elapsed
+
+
+async def allocation_pass(cog, corpus) -> dict:
+    """Per kind: [peak bytes allocated while handling, bytes still held after]."""
+    by_kind = defaultdict(lambda: [0, 0])
+    for kind, message in corpus:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        await cog.on_message(message)
+        after, peak = tracemalloc.get_traced_memory()
+        by_kind[kind][0] += peak - before
+        by_kind[kind][1] += after - before
+    await cog.repost_queue.close()
+    return by_kind
+
+
+def new_cog(bucket: float):
+    cog = link_fixer.LinkFixer(SimpleNamespace(session=None))
+    # Benchmark the pipeline, not Discord's rate limits.
+    cog.repost_queue = RepostQueue(bucket_capacity=bucket, bucket_rate=bucket)
+    return cog
+
+
+async def main(args):
+    install_config_store(args.guilds, args.mode, args.disabled_ratio)
+    corpus = build_corpus(args.messages, args.guilds, args.seed)
+
+    # Warm up caches (config slices, compiled rules, webhooks) first.
+    cog = new_cog(1e9)
+    await timed_pass(cog, corpus[: args.warmup])
+    latencies, elapsed = await timed_pass(cog, corpus)
+
+    print(f"mode={args.mode} messages={len(corpus)} guilds={args.guilds}")
+    print(f"throughput: {len(corpus) / elapsed:,.0f} msgs/s ({elapsed:.3f}s)")
+    print(f"{'kind':<12}{'count':>8}{'p50 µs':>10}{'p99 µs':>10}")
+    everything = []
+    for kind, values in sorted(latencies.items()):
+        everything.extend(values)
+        print(
+            f"{kind:<12}{len(values):>8}"
+            f"{percentile(values, 0.50):>10.1f}{percentile(values, 0.99):>10.1f}"
+        )
+    print(
+        f"{'all':<12}{len(everything):>8}"
+        f"{percentile(everything, 0.50):>10.1f}{percentile(everything, 0.99):>10.1f}"
+    )
+    print(
+        "api calls per fixed link:",
+        {
+            mode: round(cog.calls_per_link(mode), 2)
+            for mode in link_fixer.LINK_FIX_MODES
+            if cog.calls_per_link(mode) is not None
+        },
+    )
+
+    if args.alloc_messages:
+        sample = corpus[: args.alloc_messages]
+        tracemalloc.start()
+        allocations = await allocation_pass(cog, sample)
+        tracemalloc.stop()
+        counts = defaultdict(int)
+        for kind, _ in sample:
+            counts[kind] += 1
+        print(f"{'kind':<12}{'peak B/msg':>12}{'held B/msg':>12}")
+        for kind, (peak, held) in sorted(allocations.items()):
+            print(f"{kind:<12}{peak / counts[kind]:>12.0f}{held / counts[kind]:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--mode", choices=link_fixer.LINK_FIX_MODES, default="webhook")
+    parser.add_argument("--disabled-ratio", type=float, default=0.1)
+    parser.add_argument("--warmup", type=int, default=1000)
+    parser.add_argument(
+        "--alloc-messages",
+        type=int,
+        default=2000,
+        help="messages replayed under tracemalloc (0 to skip)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
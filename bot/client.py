@@ -0,0 +1,196 @@
+import discord
+import logging
+import os
+import json
+import time
+from dotenv import load_dotenv
+from discord.ext import commands
+from pathlib import Path
+from .utils.database import (
+    mongo_client,
+    config_subscriber,
+    migrate_guild_configs,
+    preload_guild_configs,
+    reconcile_banned_guilds,
+)
+from .utils.indexes import ensure_indexes
+from .utils.render_backend import render_backend
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+BOT_TOKEN = os.getenv("BOT_TOKEN")
+
+SERVER_GUILD_ID = os.getenv("SERVER_GUILD_ID")
+if SERVER_GUILD_ID:
+    SERVER_GUILD_ID = int(SERVER_GUILD_ID)
+
+SYNC_COMMANDS_GLOBAL = os.getenv("SYNC_COMMANDS_GLOBAL", "False").lower() == "true"
+DEV_GUILD_IDS_STR = os.getenv("DEV_GUILD_IDS", "")
+DEV_GUILD_IDS = [
+    int(gid.strip()) for gid in DEV_GUILD_IDS_STR.split(",") if gid.strip().isdigit()
+]
+
+intents = discord.Intents.default()
+intents.members = True
+intents.message_content = True
+intents.presences = True
+
+BOT_STATUS = os.getenv("BOT_STATUS", "online")
+ACTIVITY_TYPE = os.getenv("BOT_ACTIVITY_TYPE", None)
+ACTIVITY_TEXT = os.getenv("BOT_ACTIVITY_TEXT")
+ACTIVITY_URL = os.getenv("BOT_ACTIVITY_URL", None)
+
+
+class SakuraBot(commands.Bot):
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            # Stop the render workers; a process pool would outlive the bot.
+            render_backend.shutdown()
+
+
+bot = SakuraBot(command_prefix=os.getenv("command_prefix", "!"), intents=intents)
+
+
+def get_activity(activity_type, activity_text, activity_url=None):
+    if activity_type == "custom":
+        return discord.CustomActivity(name=activity_text)
+    elif activity_type == "streaming":
+        return discord.Streaming(
+            name=activity_text, url=activity_url or "https://twitch.tv/placeholder"
+        )
+    elif activity_type == "listening":
+        return discord.Activity(type=discord.ActivityType.listening, name=activity_text)
+    elif activity_type == "watching":
+        return discord.Activity(type=discord.ActivityType.watching, name=activity_text)
+    else:
+        return discord.Game(name=activity_text or "啟動中...")
+
+
+status_map = {
+    "online": discord.Status.online,
+    "idle": discord.Status.idle,
+    "dnd": discord.Status.dnd,
+    "invisible": discord.Status.invisible,
+}
+
+
+@bot.event
+async def on_ready():
+    logging.info(f"Logged in as {bot.user.name} ({bot.user.id})")
+
+    try:
+        await mongo_client.admin.command("ping")
+        logging.info("✅ MongoDB Connection Sucess!")
+    except Exception as e:
+        logging.error(f"❌ MongoDB Connection Fail: {e}")
+
+    try:
+        await ensure_indexes()
+        logger.info("✅ 資料庫索引檢查完成。")
+    except Exception as e:
+        logger.error(f"❌ 建立資料庫索引失敗：{e}")
+
+    try:
+        migrated = await migrate_guild_configs()
+        logger.info(f"✅ 設定資料遷移完成，共更新 {migrated} 筆。")
+    except Exception as e:
+        logger.error(f"❌ 設定資料遷移失敗：{e}")
+
+    # 在載入模組（開始處理事件）前預先載入所有伺服器設定
+    try:
+        started = time.perf_counter()
+        preloaded = await preload_guild_configs(guild.id for guild in bot.guilds)
+        logger.info(
+            f"✅ 已預載 {preloaded}/{len(bot.guilds)} 筆伺服器設定，"
+            f"耗時 {time.perf_counter() - started:.2f} 秒。"
+        )
+    except Exception as e:
+        logger.error(f"❌ 預載伺服器設定失敗：{e}")
+
+    try:
+        await reconcile_banned_guilds()
+        logger.info("✅ 已載入封禁伺服器清單。")
+    except Exception as e:
+        logger.error(f"❌ 載入封禁伺服器清單失敗：{e}")
+
+    if not config_subscriber.running:
+        config_subscriber.start()
+        logger.info("✅ 已啟動伺服器設定同步監聽。")
+
+    try:
+        await render_backend.start()
+        logger.info(f"✅ 已啟動圖片繪製後端：{render_backend.kind}。")
+    except Exception as e:
+        logger.error(f"❌ 啟動圖片繪製後端失敗：{e}")
+
+    # 自動載入 bot/cogs 下的所有 .py 模組
+    cogs_path = Path(__file__).parent / "cogs"
+    loaded_count = 0
+    failed_count = 0
+
+    for file in cogs_path.rglob("*.py"):
+        if file.name.startswith("_"):
+            continue
+        relative = file.relative_to(Path(__file__).parent.parent)
+        module_name = ".".join(relative.with_suffix("").parts)
+        try:
+            await bot.load_extension(module_name)
+            logger.info(f"✅ 成功載入模組：{module_name}")
+            loaded_count += 1
+        except Exception as e:
+            logger.error(f"❌ 載入模組 {module_name} 失敗：{e}")
+            failed_count += 1
+
+    logger.info(f"📦 共載入 {loaded_count} 個模組，失敗 {failed_count} 個。")
+
+    # --- Command Synchronization Logic ---
+    if SYNC_COMMANDS_GLOBAL:
+        try:
+            commands_synced = await bot.tree.sync()
+            logger.info(f"✅ 已全局同步 {len(commands_synced)} 個指令。")
+        except Exception as e:
+            logger.error(f"❌ 全域指令同步時發生錯誤：{e}")
+    else:
+        guild_ids_to_sync = []
+        if SERVER_GUILD_ID:
+            guild_ids_to_sync.append(SERVER_GUILD_ID)
+        guild_ids_to_sync.extend(DEV_GUILD_IDS)
+        guild_ids_to_sync = list(set(guild_ids_to_sync))
+
+        if not guild_ids_to_sync:
+            logger.warning(
+                "DEV_GUILD_IDS 和 SERVER_GUILD_ID 都未設定，將不進行指令同步。"
+            )
+        else:
+            for guild_id in guild_ids_to_sync:
+                guild = bot.get_guild(guild_id)
+                if guild:
+                    try:
+                        commands_synced = await bot.tree.sync(guild=guild)
+                        logger.info(
+                            f"✅ 已在伺服器 {guild.name} ({guild.id}) 同步 {len(commands_synced)} 個指令。"
+                        )
+                    except discord.errors.Forbidden:
+                        logger.error(
+                            f"❌ 無法同步 {guild.name} ({guild.id}) 指令：缺少 '應用程式指令' 權限。"
+                        )
+                    except Exception as e:
+                        logger.error(
+                            f"❌ 同步 {guild.name} ({guild.id}) 指令時發生錯誤：{e}"
+                        )
+                else:
+                    logger.warning(
+                        f"ℹ️ 機器人不在 ID 為 {guild_id} 的伺服器中，跳過指令同步。"
+                    )
+    # --- End Command Synchronization Logic ---
+
+    activity = get_activity(ACTIVITY_TYPE, ACTIVITY_TEXT, ACTIVITY_URL)
+    status = status_map.get(BOT_STATUS)
+    await bot.change_presence(status=status, activity=activity)
+    logger.info(
+        f"✅ 狀態設置為 {BOT_STATUS}，類型為 {ACTIVITY_TYPE}，內容為 {ACTIVITY_TEXT}。"
+    )
+
@@ -4,7 +4,8 @@ from discord.ext import commands
 from discord.ui import Button, View, Select
 from datetime import datetime
 import logging
-from bot.utils.database import get_guild_data, log_ban
+from bot.utils.database import get_guild_data, log_ban, ban_audit_queue
+from bot.utils.ban_export import export_ban_history
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -26,6 +27,15 @@ class BanSystemView(View):
         select_users_button.callback = self.select_users
         self.add_item(select_users_button)
 
+        # Export history button
+        export_button = Button(
+            label="匯出紀錄",
+            style=discord.ButtonStyle.secondary,
+            custom_id="export_ban_history_button",
+        )
+        export_button.callback = self.export_history
+        self.add_item(export_button)
+
         # Cancel button
         cancel_button = Button(
             label="取消",
@@ -120,6 +130,37 @@ class BanSystemView(View):
             ephemeral=True,
         )
 
+    async def export_history(self, interaction: discord.Interaction):
+        if not await self.check_user_permissions(interaction.user):
+            await interaction.response.send_message(
+                "你需要封禁成員權限來執行此操作！", ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        # Persistent views are registered with a placeholder guild, so use the
+        # interaction's guild rather than self.guild.
+        export_file, count = await export_ban_history(
+            "csv", guild_id=interaction.guild.id
+        )
+        if not count:
+            export_file.close()
+            await interaction.followup.send("目前沒有任何封禁紀錄。", ephemeral=True)
+            return
+        try:
+            await interaction.followup.send(
+                content=f"共 {count} 筆封禁紀錄：",
+                file=discord.File(export_file, filename="ban_history.csv"),
+                ephemeral=True,
+            )
+        except discord.HTTPException as e:
+            logger.error(f"Failed to send ban history export: {e}")
+            await interaction.followup.send(
+                "匯出檔案過大或上傳失敗，請稍後再試。", ephemeral=True
+            )
+        finally:
+            export_file.close()
+
     async def cancel(self, interaction: discord.Interaction):
         await interaction.response.send_message("已取消操作。", ephemeral=True)
 
@@ -178,7 +219,7 @@ class ConfirmBanUserView(View):
                 )
                 banned_members.append(member)
 
-                # Log to database
+                # Queue for the database; written in batches by ban_audit_queue
                 ban_data = {
                     "guild_id": self.guild.id,
                     "user_id": member.id,
@@ -275,6 +316,10 @@ class BanSystem(commands.Cog):
         view = BanSystemView({}, placeholder_guild)
         self.bot.add_view(view)
 
+    async def cog_unload(self):
+        # Write out any ban records still waiting in the audit queue
+        await ban_audit_queue.close()
+
     @app_commands.command(name="ban_panel", description="發送封禁管理面板")
     @app_commands.default_permissions(manage_guild=True)
     async def ban_panel(self, interaction: discord.Interaction):
@@ -318,6 +363,7 @@ class BanSystem(commands.Cog):
             description=(
                 "使用以下按鈕管理封禁：\n"
                 "- **選擇成員**: 管理員專用，選擇並封禁伺服器內成員\n"
+                "- **匯出紀錄**: 下載本伺服器的封禁紀錄 (CSV)\n"
                 "- **取消**: 取消操作\n"
             ),
             color=discord.Color.red(),
@@ -374,6 +420,7 @@ class BanSystem(commands.Cog):
             description=(
                 "使用以下按鈕管理封禁：\n"
                 "- **選擇成員**: 管理員專用，選擇並封禁伺服器內成員\n"
+                "- **匯出紀錄**: 下載本伺服器的封禁紀錄 (CSV)\n"
                 "- **取消**: 取消操作\n"
                 "\n*伺服器封禁請使用 `/devpanel` 指令*"
             ),
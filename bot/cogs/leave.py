@@ -5,16 +5,16 @@ import aiohttp
 import io
 import logging
 from datetime import datetime
-import asyncio
 
 from bot.utils.database import get_guild_data
-from bot.utils.image_processing import ImageProcessor
+from bot.utils.asset_cache import asset_cache
+from bot.utils.render_backend import render_backend
+from bot.utils.render_cache import render_cache, render_key
 
 
 class Leave(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.image_processor = ImageProcessor()
         if not hasattr(self.bot, "session") or not isinstance(
             self.bot.session, aiohttp.ClientSession
         ):
@@ -29,18 +29,6 @@ class Leave(commands.Cog):
         ):
             await self.bot.session.close()
 
-    async def download_image(self, url: str) -> io.BytesIO | None:
-        if not url:
-            return None
-        try:
-            async with self.bot.session.get(url) as response:
-                response.raise_for_status()
-                image_bytes = await response.read()
-                return io.BytesIO(image_bytes)
-        except aiohttp.ClientError as e:
-            logging.error(f"Error downloading image from {url}: {e}")
-            return None
-
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
         guild_data = await get_guild_data(member.guild.id)
@@ -70,33 +58,52 @@ class Leave(commands.Cog):
 
         file = None
         if leave_image_enabled:
-            avatar_data = await self.download_image(avatar_url)
-            banner_data = await self.download_image(banner_to_download_url)
             created_at_str = (
                 member.created_at.strftime("%Y/%m/%d %H:%M")
                 if member.created_at
                 else "未知日期"
             )
 
-            processed_image_buffer = await asyncio.to_thread(
-                self.image_processor.process_image_sync,
-                banner_data,
-                avatar_data,
-                member.display_name,
-                member.name,
-                member.discriminator,
-                created_at_str,
-                leave_generate_gif,
+            async def render() -> bytes | None:
+                avatar_data = await asset_cache.fetch(
+                    self.bot.session, member.display_avatar
+                )
+                banner_data = await asset_cache.fetch(
+                    self.bot.session,
+                    user.banner or leave_custom_banner_url or member.display_avatar,
+                )
+                return await render_backend.render(
+                    banner_data,
+                    avatar_data,
+                    member.display_name,
+                    member.name,
+                    member.discriminator,
+                    created_at_str,
+                    leave_generate_gif,
+                )
+
+            image_bytes = await render_cache.get_or_render(
+                render_key(
+                    avatar_key=member.display_avatar.key,
+                    banner_key=user.banner.key if user.banner else banner_to_download_url,
+                    display_name=member.display_name,
+                    username=member.name,
+                    discriminator=member.discriminator,
+                    date_text=created_at_str,
+                    generate_gif=leave_generate_gif,
+                    variant="leave",
+                ),
+                render,
             )
 
-            if processed_image_buffer:
-                is_gif = processed_image_buffer.getvalue()[:4] == b"GIF8"
+            if image_bytes:
+                is_gif = image_bytes[:4] == b"GIF8"
                 filename = "leave_profile.gif" if is_gif else "leave_profile.png"
-                file = discord.File(processed_image_buffer, filename=filename)
+                file = discord.File(io.BytesIO(image_bytes), filename=filename)
                 logging.info(f"Debug: Leave file prepared: {filename}")
             else:
                 logging.error(
-                    "Debug: processed_image_buffer is None for leave message."
+                    "Debug: image_bytes is None for leave message."
                 )
 
         leave_message = leave_message_template.format(
@@ -1,87 +1,301 @@
+import asyncio
+import os
+import time
+
 from discord.ext import commands
+from discord import app_commands
+import aiohttp
 import discord
-import re
-from urllib.parse import urlparse
-from ..utils.database import get_guild_data
+from ..utils.cache import TTLCache
+from ..utils.database import DEFAULT_CONFIG, get_config_version, get_guild_data
+from ..utils.link_resolver import SHORT_LINK_HOSTS, short_link_resolver
+from ..utils.repost_queue import RepostQueue
+from ..utils.link_rewriter import (
+    DomainFilter,
+    LinkRewriteRules,
+    compile_link_rules,
+)
+
+# The only config fields on_message reads; fetched and cached as one slice.
+LINK_FIX_FIELDS = (
+    "auto_link_fix",
+    "allowed_channels",
+    "platforms",
+    "platform_replacements",
+    "preserve_original_link",
+    "resolve_short_links",
+    "link_fix_mode",
+)
+
+WEBHOOK_NAME = "AutoLinkFixer"
+LINK_FIX_MODES = ("webhook", "reply")
+# A webhooks update arriving this soon after our own create_webhook is
+# assumed to be that creation's echo.
+WEBHOOK_CREATE_ECHO_WINDOW = 10.0
 
 
 class LinkFixer(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # guild_id -> (config version, compiled rules)
+        self._rules_cache = TTLCache(maxsize=4096, ttl=3600)
+        # channel_id -> AutoLinkFixer webhook, looked up or created once.
+        self._webhooks: dict[int, discord.Webhook] = {}
+        self._webhook_locks: dict[int, asyncio.Lock] = {}
+        # channel_id -> when we created its webhook, until the echo arrives.
+        self._webhook_created: dict[int, float] = {}
+        # Prefilter state, checked before any config lookup in on_message.
+        self._domain_filter = DomainFilter(
+            [*DEFAULT_CONFIG["platform_replacements"], *SHORT_LINK_HOSTS]
+        )
+        # guild_id -> (config version, allowed channel IDs)
+        self._guild_state: dict[int, tuple] = {}
+        self._disabled_guilds: set[int] = set()
+        self.repost_queue = RepostQueue(
+            bucket_capacity=float(os.getenv("REPOST_BUCKET_SIZE", "5")),
+            bucket_rate=float(os.getenv("REPOST_BUCKET_RATE", "0.5")),
+        )
+        # mode -> REST calls made and links fixed, for comparing modes.
+        self.call_stats = {mode: {"calls": 0, "links": 0} for mode in LINK_FIX_MODES}
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
-            return
+    def record_calls(self, mode: str, calls: int = 0, links: int = 0):
+        stats = self.call_stats[mode]
+        stats["calls"] += calls
+        stats["links"] += links
+
+    def calls_per_link(self, mode: str) -> float | None:
+        stats = self.call_stats[mode]
+        return stats["calls"] / stats["links"] if stats["links"] else None
+
+    async def cog_unload(self):
+        await self.repost_queue.close()
 
+    def remember_guild(self, guild_id: int, version: tuple, config: dict):
+        """Record what the prefilter needs to know about a guild's config."""
+        self._domain_filter.update(config.get("platform_replacements", {}))
+        if config.get("auto_link_fix", False):
+            self._disabled_guilds.discard(guild_id)
+        else:
+            self._disabled_guilds.add(guild_id)
+        channels = frozenset(int(c) for c in config.get("allowed_channels", []))
+        self._guild_state[guild_id] = (version, channels)
+
+    def prefilter(self, message: discord.Message) -> bool | None:
+        """True/False when the message can be decided without I/O, else None.
+
+        None means the guild's config hasn't been seen at its current
+        version, so on_message must fetch it.
+        """
+        content = message.content
+        if "://" not in content:
+            return False
         guild_id = message.guild.id
-        config = await get_guild_data(guild_id)
+        state = self._guild_state.get(guild_id)
+        if state is None or state[0] != get_config_version(guild_id):
+            return None
+        if guild_id in self._disabled_guilds:
+            return False
+        if state[1] and message.channel.id not in state[1]:
+            return False
+        return self._domain_filter.search(content)
 
-        if not config.get("auto_link_fix", False):
-            return
+    def get_link_rules(self, guild_id: int, config: dict) -> LinkRewriteRules:
+        version = get_config_version(guild_id)
+        cached = self._rules_cache.get(guild_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        rules = compile_link_rules(
+            config.get("platform_replacements", {}), config.get("platforms", {})
+        )
+        self._rules_cache.set(guild_id, (version, rules))
+        return rules
 
-        allowed_channels = config.get("allowed_channels", [])
-        if allowed_channels and str(message.channel.id) not in allowed_channels:
-            return
+    def get_session(self) -> aiohttp.ClientSession:
+        session = getattr(self.bot, "session", None)
+        if not isinstance(session, aiohttp.ClientSession) or session.closed:
+            session = self.bot.session = aiohttp.ClientSession()
+        return session
 
-        platforms_config = config.get("platforms", {})
-        platform_replacements = config.get("platform_replacements", {})
-        preserve = config.get("preserve_original_link", False)
+    @staticmethod
+    def needs_resolving(config: dict, content: str) -> bool:
+        """Whether fix_content will follow short-link redirects (network I/O)."""
+        return config.get("resolve_short_links", False) and bool(
+            short_link_resolver.short_links(content)
+        )
 
-        url_pattern = re.compile(r"https?://[^\s]+")
-        matches = url_pattern.findall(message.content)
+    async def fix_content(self, guild_id: int | None, config: dict, content: str):
+        """(rewritten content, fixed links), or None when nothing can be fixed."""
+        if guild_id is None:
+            rules = compile_link_rules(
+                config["platform_replacements"], config["platforms"]
+            )
+        else:
+            rules = self.get_link_rules(guild_id, config)
+        if self.needs_resolving(config, content):
+            content = await short_link_resolver.expand(content, self.get_session())
+        fixed, links = rules.fix(content, config.get("preserve_original_link", False))
+        return (fixed, links) if links else None
 
-        if not matches:
-            return
+    async def get_webhook(self, channel) -> discord.Webhook:
+        webhook = self._webhooks.get(channel.id)
+        if webhook is not None:
+            return webhook
+
+        # Concurrent messages in a new channel wait here instead of each
+        # listing (and possibly creating) webhooks.
+        lock = self._webhook_locks.setdefault(channel.id, asyncio.Lock())
+        async with lock:
+            webhook = self._webhooks.get(channel.id)
+            if webhook is not None:
+                return webhook
+            webhooks = await channel.webhooks()
+            self.record_calls("webhook", 1)
+            for wh in webhooks:
+                if wh.name == WEBHOOK_NAME:
+                    webhook = wh
+                    break
+            if webhook is None:
+                webhook = await channel.create_webhook(name=WEBHOOK_NAME)
+                self.record_calls("webhook", 1)
+                self._webhook_created[channel.id] = time.monotonic()
+            self._webhooks[channel.id] = webhook
+            return webhook
 
-        fixed_content = message.content
+    def invalidate_webhook(self, channel_id: int):
+        self._webhooks.pop(channel_id, None)
 
-        for url in matches:
-            parsed = urlparse(url)
-            domain = parsed.netloc.replace("www.", "")
+    @commands.Cog.listener()
+    async def on_webhooks_update(self, channel):
+        created = self._webhook_created.pop(channel.id, None)
+        if (
+            created is not None
+            and time.monotonic() - created < WEBHOOK_CREATE_ECHO_WINDOW
+        ):
+            # Our own create_webhook; the cached webhook is still valid.
+            return
+        self.invalidate_webhook(channel.id)
 
-            replacement_entry = platform_replacements.get(domain)
-            if not replacement_entry:
-                continue
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.invalidate_webhook(channel.id)
+        self._webhook_locks.pop(channel.id, None)
+        self._webhook_created.pop(channel.id, None)
 
-            if isinstance(replacement_entry, dict):
-                replacement_domain = replacement_entry.get("replacement")
-                platform_label = replacement_entry.get("label")
-                path_filter = replacement_entry.get("path_prefix")
-                if path_filter and not parsed.path.startswith(path_filter):
-                    continue
-            else:
-                replacement_domain, platform_label = replacement_entry
-                path_filter = None
+    async def send_via_webhook(self, message: discord.Message, content: str):
+        for attempt in range(2):
+            webhook = await self.get_webhook(message.channel)
+            self.record_calls("webhook", 1)
+            try:
+                await webhook.send(
+                    content=content,
+                    username=message.author.display_name,
+                    avatar_url=message.author.display_avatar.url,
+                )
+                return
+            except discord.NotFound:
+                # The cached webhook was deleted; look it up again once.
+                self.invalidate_webhook(message.channel.id)
+                if attempt:
+                    raise
 
-            if not platforms_config.get(platform_label, False):
-                continue
+    @app_commands.command(name="linkfix", description="將連結轉換為 FxEmbed 連結")
+    @app_commands.describe(link="要轉換的連結（可包含多個）")
+    async def linkfix(self, interaction: discord.Interaction, link: str):
+        if interaction.guild:
+            guild_id = interaction.guild.id
+            config = await get_guild_data(guild_id, fields=LINK_FIX_FIELDS)
+        else:
+            guild_id, config = None, DEFAULT_CONFIG
+        if self.needs_resolving(config, link):
+            # Following redirects can outlast the interaction deadline.
+            await interaction.response.defer(thinking=True)
+        result = await self.fix_content(guild_id, config, link)
+        send = (
+            interaction.followup.send
+            if interaction.response.is_done()
+            else interaction.response.send_message
+        )
+        if result is None:
+            await send("❌ 沒有可以轉換的連結。", ephemeral=True)
+            return
+        await send(result[0])
 
-            fixed_url = url.replace(domain, replacement_domain)
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.author.bot or not message.guild:
+            return
 
-            if preserve:
-                replacement = f"[{platform_label}]({fixed_url})"
-            else:
-                replacement = fixed_url
+        verdict = self.prefilter(message)
+        if verdict is False:
+            return
 
-            fixed_content = fixed_content.replace(url, replacement)
+        guild_id = message.guild.id
+        version = get_config_version(guild_id)
+        config = await get_guild_data(guild_id, fields=LINK_FIX_FIELDS)
+        if verdict is None:
+            self.remember_guild(guild_id, version, config)
+            if self.prefilter(message) is False:
+                return
 
-        if fixed_content != message.content:
-            webhook = None
-            for wh in await message.channel.webhooks():
-                if wh.name == "AutoLinkFixer":
-                    webhook = wh
-                    break
+        if self.needs_resolving(config, message.content):
+            # Resolve inside the job: the message takes its place in the
+            # channel's queue now, not after the redirects are followed.
+            job = lambda: self.fix_and_send(message, config)
+        else:
+            result = await self.fix_content(guild_id, config, message.content)
+            if result is None:
+                return
+            job = lambda: self.send_fixed(message, config, result)
+        self.repost_queue.submit(message.channel.id, job)
 
-            if webhook is None:
-                webhook = await message.channel.create_webhook(name="AutoLinkFixer")
+    async def fix_and_send(self, message: discord.Message, config: dict):
+        result = await self.fix_content(message.guild.id, config, message.content)
+        if result is not None:
+            await self.send_fixed(message, config, result)
 
-            await webhook.send(
-                content=fixed_content,
-                username=message.author.display_name,
-                avatar_url=message.author.display_avatar.url,
+    async def send_fixed(self, message: discord.Message, config: dict, result):
+        fixed_content, links = result
+        mode = config.get("link_fix_mode", "webhook")
+        if mode not in LINK_FIX_MODES:
+            mode = "webhook"
+        self.record_calls(mode, links=len(links))
+        if mode == "reply":
+            await self.reply_with_links(message, links)
+        else:
+            await self.repost(message, fixed_content)
+
+    async def repost(self, message: discord.Message, content: str):
+        # Order is kept by the per-channel queue, so the delete doesn't have
+        # to wait for the webhook send.
+        self.record_calls("webhook", 1)
+        sent, deleted = await asyncio.gather(
+            self.send_via_webhook(message, content),
+            message.delete(),
+            return_exceptions=True,
+        )
+        if isinstance(sent, Exception) and not isinstance(deleted, Exception):
+            # The original is already gone; post the fixed content as the bot
+            # so the user's message isn't lost.
+            self.record_calls("webhook", 1)
+            await message.channel.send(
+                f"**{message.author.display_name}**: {content}",
+                allowed_mentions=discord.AllowedMentions.none(),
             )
-            await message.delete()
+        for result in (sent, deleted):
+            if isinstance(result, Exception):
+                raise result
+
+    async def reply_with_links(self, message: discord.Message, links: list[str]):
+        """Hide the original embeds and reply with just the fixed links."""
+        self.record_calls("reply", 2)
+        results = await asyncio.gather(
+            message.edit(suppress=True),
+            message.reply("\n".join(links), mention_author=False),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
 
 
 async def setup(bot):
@@ -3,6 +3,7 @@ from discord import app_commands
 from discord.ext import commands
 from ..views.linkfix_settings_view import LinkFixSettingsView
 from ..utils.database import get_guild_data
+from ..utils.permissions import permission_resolver
 
 
 class LinkFixSettings(commands.Cog):
@@ -21,6 +22,11 @@ class LinkFixSettings(commands.Cog):
         await view.add_role_select(interaction)
         await interaction.followup.send(embed=embed, view=view, ephemeral=True)
 
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        # The deleted role may have been the bot manager or an allowed role.
+        permission_resolver.invalidate(role.guild.id)
+
 
 async def setup(bot):
     await bot.add_cog(LinkFixSettings(bot))
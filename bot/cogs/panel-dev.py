@@ -2,12 +2,17 @@
 import os
 import discord
 from discord import ui, app_commands, Interaction
-from discord.ext import commands
+from discord.ext import commands, tasks
 from datetime import datetime
 import logging
-from bot.utils.database import get_guild_data, log_ban, is_server_banned, unban_server, get_banned_servers
+import tempfile
+from bot.utils.ban_export import export_ban_history, SPOOL_MAX_BYTES
+from bot.utils.asset_cache import asset_cache
+from bot.utils.render_cache import render_cache
+from bot.utils.database import get_guild_data, log_ban, is_server_banned, unban_server, iter_ban_history, get_guild_cache_stats, config_subscriber, reconcile_banned_guilds, ban_audit_queue
 
 BOT_OWNER_IDS = int(os.getenv("BOT_OWNER_IDS"))
+BAN_RECONCILE_MINUTES = float(os.getenv("BAN_RECONCILE_MINUTES", "10"))
 START_TIME = datetime.utcnow()
 
 # Set up logging
@@ -45,6 +50,83 @@ class DevPanelView(ui.View):
             value=f"{hours} 小時 {minutes} 分 {seconds} 秒",
             inline=False,
         )
+        cache_stats = get_guild_cache_stats()
+        embed.add_field(
+            name="🗄️ 設定快取",
+            value=(
+                f"{cache_stats['size']}/{cache_stats['maxsize']} 筆，"
+                f"命中 {cache_stats['hits']} / 未命中 {cache_stats['misses']} "
+                f"({cache_stats['hit_rate']:.1%})，淘汰 {cache_stats['evictions']}"
+            ),
+            inline=False,
+        )
+        sync_stats = config_subscriber.stats()
+        last_lag = sync_stats["last_lag"]
+        embed.add_field(
+            name="🔄 設定同步",
+            value=(
+                f"模式 {sync_stats['mode'] or '未啟動'}，事件 {sync_stats['events']}，"
+                f"延遲 {f'{last_lag:.2f}s' if last_lag is not None else '—'} "
+                f"(最大 {sync_stats['max_lag']:.2f}s)"
+            ),
+            inline=False,
+        )
+        audit_stats = ban_audit_queue.stats()
+        last_flush = audit_stats["last_flush_latency"]
+        embed.add_field(
+            name="📝 封禁紀錄佇列",
+            value=(
+                f"待寫入 {audit_stats['depth']} 筆，已寫入 {audit_stats['written']} 筆 "
+                f"({audit_stats['flushes']} 批)，放棄 {audit_stats['rejected']} 筆，"
+                f"寫入耗時 {f'{last_flush * 1000:.1f}ms' if last_flush is not None else '—'}"
+            ),
+            inline=False,
+        )
+        render_stats = render_cache.stats()
+        embed.add_field(
+            name="🖼️ 橫幅快取",
+            value=(
+                f"命中率 {render_stats['hit_rate']:.1%} "
+                f"(記憶體 {render_stats['memory_hits']} / 磁碟 {render_stats['disk_hits']} "
+                f"/ 未命中 {render_stats['misses']})，"
+                f"節省 {render_stats['bytes_saved'] / 1024 / 1024:.1f} MB、"
+                f"約 {render_stats['render_seconds_saved']:.1f}s 算圖時間"
+            ),
+            inline=False,
+        )
+        asset_stats = asset_cache.stats()
+        embed.add_field(
+            name="📦 頭像/橫幅下載快取",
+            value=(
+                f"{asset_stats['entries']} 筆 "
+                f"({asset_stats['bytes'] / 1024 / 1024:.1f}/"
+                f"{asset_stats['byte_budget'] / 1024 / 1024:.0f} MB)，"
+                f"命中率 {asset_stats['hit_rate']:.1%}，"
+                f"重新驗證 {asset_stats['revalidated']} 次"
+            ),
+            inline=False,
+        )
+        link_fixer = self.bot.get_cog("LinkFixer")
+        if link_fixer is not None:
+            repost_queue = link_fixer.repost_queue
+            totals = repost_queue.total_stats()
+            lines = [
+                f"頻道 {totals['channels']} 個，排隊 {totals['depth']} 則，"
+                f"已轉貼 {totals['processed']} 則，失敗 {totals['failed']} 則"
+            ]
+            busiest = sorted(
+                repost_queue.stats().items(),
+                key=lambda item: (item[1]["depth"], item[1]["processed"]),
+                reverse=True,
+            )[:3]
+            for channel_id, stats in busiest:
+                if stats["avg_latency"] is None:
+                    continue
+                lines.append(
+                    f"<#{channel_id}> 排隊 {stats['depth']}，"
+                    f"平均 {stats['avg_latency']:.2f}s / p95 {stats['p95_latency']:.2f}s"
+                )
+            embed.add_field(name="🔁 轉貼佇列", value="\n".join(lines), inline=False)
         embed.set_footer(
             text=f"由 {self.bot.user.name} 提供服務", icon_url=self.bot.user.avatar.url
         )
@@ -57,6 +139,8 @@ class ServerManagementSelect(ui.Select):
         options = [
             discord.SelectOption(label="🔨 封禁伺服器", value="ban_server", description="讓機器人離開指定伺服器並封禁"),
             discord.SelectOption(label="✅ 解除伺服器封禁", value="unban_server", description="允許機器人重新加入被封禁的伺服器"),
+            discord.SelectOption(label="📄 匯出封禁紀錄 (CSV)", value="export_bans_csv", description="下載所有伺服器的封禁紀錄"),
+            discord.SelectOption(label="📄 匯出封禁紀錄 (NDJSON)", value="export_bans_ndjson", description="下載所有伺服器的封禁紀錄"),
         ]
         super().__init__(
             placeholder="選擇伺服器管理操作",
@@ -202,6 +286,27 @@ class ServerManagementSelect(ui.Select):
 
             await interaction.response.send_modal(UnbanServerModal())
 
+        elif selected in ("export_bans_csv", "export_bans_ndjson"):
+            await interaction.response.defer(ephemeral=True)
+            fmt = "csv" if selected == "export_bans_csv" else "ndjson"
+            export_file, count = await export_ban_history(fmt)
+            if not count:
+                export_file.close()
+                await interaction.followup.send("目前沒有任何封禁紀錄。", ephemeral=True)
+                return
+            try:
+                await interaction.followup.send(
+                    file=discord.File(export_file, filename=f"ban_history.{fmt}"),
+                    ephemeral=True,
+                    content=f"共 {count} 筆封禁紀錄：",
+                )
+                logger.info(f"Sent {fmt} ban history export ({count} records) to {interaction.user.id}")
+            except discord.HTTPException as e:
+                logger.error(f"Failed to send ban history export: {e}")
+                await interaction.followup.send("❌ 匯出檔案過大或上傳失敗。", ephemeral=True)
+            finally:
+                export_file.close()
+
 
 class ViewJoinedServersButton(ui.Button):
     def __init__(self, bot: commands.Bot):
@@ -247,31 +352,31 @@ class ViewBannedServersButton(ui.Button):
     async def callback(self, interaction: Interaction):
         await interaction.response.defer(ephemeral=True)
 
-        banned_servers_data = await get_banned_servers()
-        banned_list = []
-
-        if not banned_servers_data:
-            await interaction.followup.send("目前沒有任何封禁的伺服器。", ephemeral=True)
-            return
-
-        for ban_record in banned_servers_data:
+        file_data = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        count = 0
+        async for ban_record in iter_ban_history(ban_type="server", active=True):
             guild_id = ban_record.get("guild_id")
             guild_name = ban_record.get("guild_name", "未知伺服器名稱")
             ban_timestamp = ban_record.get("timestamp")
 
             formatted_date = ban_timestamp.strftime("%Y-%m-%d %H:%M:%S UTC") if ban_timestamp else "未知時間"
 
-            banned_list.append(f"伺服器名稱: {guild_name}, 伺服器 ID: {guild_id}, 封禁時間: {formatted_date}")
+            line = f"伺服器名稱: {guild_name}, 伺服器 ID: {guild_id}, 封禁時間: {formatted_date}"
+            file_data.write((("\n" if count else "") + line).encode('utf-8'))
+            count += 1
 
-        import io
-        file_content = "\n".join(banned_list)
-        file_data = io.BytesIO(file_content.encode('utf-8'))
+        if not count:
+            file_data.close()
+            await interaction.followup.send("目前沒有任何封禁的伺服器。", ephemeral=True)
+            return
 
+        file_data.seek(0)
         await interaction.followup.send(
             file=discord.File(file_data, filename="banned_servers.txt"),
             ephemeral=True,
             content="以下是已封禁的伺服器列表："
         )
+        file_data.close()
         logger.info(f"Generated and sent banned servers list to {interaction.user.id}")
 
 
@@ -352,6 +457,21 @@ class StatusSelect(ui.Select):
 class DevPanel(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.reconcile_bans.start()
+
+    async def cog_unload(self):
+        self.reconcile_bans.cancel()
+
+    @tasks.loop(minutes=BAN_RECONCILE_MINUTES)
+    async def reconcile_bans(self):
+        """Catch server bans changed outside this process (other shards, manual edits)."""
+        try:
+            drift = await reconcile_banned_guilds()
+        except Exception as e:
+            logger.error(f"Failed to reconcile banned guilds: {e}")
+            return
+        if drift:
+            logger.info(f"Banned guild set reconciled, {drift} guild(s) changed.")
 
     @app_commands.command(
         name="devpanel", description="僅限機器人擁有者可見的開發者控制面板"
@@ -6,10 +6,12 @@ from datetime import datetime
 import io
 import warnings
 import aiohttp
-import logging, asyncio
+import logging
 
 from bot.utils.database import get_guild_data
-from bot.utils.image_processing import ImageProcessor
+from bot.utils.asset_cache import asset_cache
+from bot.utils.render_backend import render_backend
+from bot.utils.render_cache import render_cache, render_key
 
 warnings.filterwarnings("ignore", category=UserWarning, module="imageio.plugins.pillow")
 
@@ -17,7 +19,6 @@ warnings.filterwarnings("ignore", category=UserWarning, module="imageio.plugins.
 class UserProfile(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.image_processor = ImageProcessor()
         if not hasattr(self.bot, "session") or not isinstance(
             self.bot.session, aiohttp.ClientSession
         ):
@@ -32,18 +33,6 @@ class UserProfile(commands.Cog):
         ):
             await self.bot.session.close()
 
-    async def download_image(self, url: str) -> io.BytesIO | None:
-        if not url:
-            return None
-        try:
-            async with self.bot.session.get(url) as response:
-                response.raise_for_status()
-                image_bytes = await response.read()
-                return io.BytesIO(image_bytes)
-        except aiohttp.ClientError as e:
-            logging.error(f"Error downloading image from {url}: {e}")
-            return None
-
     @app_commands.command(name="user-profile", description="查詢用戶資訊")
     async def user_profile(
         self, interaction: discord.Interaction, member: discord.Member = None
@@ -76,35 +65,53 @@ class UserProfile(commands.Cog):
             user.banner.url if user.banner else (custom_banner_url or avatar_url)
         )
 
-        avatar_data = await self.download_image(avatar_url)
-        banner_data = await self.download_image(banner_to_download_url)
-
         created_at_str = (
             member_to_use.created_at.strftime("%Y/%m/%d %H:%M")
             if member_to_use.created_at
             else "未知日期"
         )
 
-        processed_image_buffer = await asyncio.to_thread(
-            self.image_processor.process_image_sync,
-            banner_data,
-            avatar_data,
-            member_to_use.display_name,
-            member_to_use.name,
-            member_to_use.discriminator,
-            created_at_str,
-            generate_gif_enabled,
+        async def render() -> bytes | None:
+            avatar_data = await asset_cache.fetch(
+                self.bot.session, member_to_use.display_avatar
+            )
+            banner_data = await asset_cache.fetch(
+                self.bot.session,
+                user.banner or custom_banner_url or member_to_use.display_avatar,
+            )
+            return await render_backend.render(
+                banner_data,
+                avatar_data,
+                member_to_use.display_name,
+                member_to_use.name,
+                member_to_use.discriminator,
+                created_at_str,
+                generate_gif_enabled,
+            )
+
+        image_bytes = await render_cache.get_or_render(
+            render_key(
+                avatar_key=member_to_use.display_avatar.key,
+                banner_key=user.banner.key if user.banner else banner_to_download_url,
+                display_name=member_to_use.display_name,
+                username=member_to_use.name,
+                discriminator=member_to_use.discriminator,
+                date_text=created_at_str,
+                generate_gif=generate_gif_enabled,
+                variant="profile",
+            ),
+            render,
         )
 
         file = None
-        if processed_image_buffer:
-            is_gif = processed_image_buffer.getvalue()[:4] == b"GIF8"
+        if image_bytes:
+            is_gif = image_bytes[:4] == b"GIF8"
             filename = "user_profile.gif" if is_gif else "user_profile.png"
-            file = discord.File(processed_image_buffer, filename=filename)
+            file = discord.File(io.BytesIO(image_bytes), filename=filename)
             logging.info(f"Debug: Output file prepared: {filename}")
         else:
             logging.error(
-                "Debug: processed_image_buffer is None. File will not be attached."
+                "Debug: image_bytes is None. File will not be attached."
             )
 
         embed = discord.Embed(
@@ -0,0 +1,150 @@
+# bot/utils/asset_cache.py
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+import aiohttp
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+class CachedAsset(NamedTuple):
+    data: bytes
+    etag: str | None
+    checked_at: float
+
+
+def asset_cache_key(asset: discord.Asset) -> str:
+    """`asset.key` plus the size and format encoded in its URL."""
+    parts = urlsplit(asset.url)
+    size = parse_qs(parts.query).get("size", [""])[0]
+    fmt = os.path.splitext(parts.path)[1].lstrip(".")
+    return f"{asset.key}:{size}:{fmt}"
+
+
+class AssetCache:
+    """Shared cache for avatar/banner bytes downloaded from the Discord CDN.
+
+    Entries are keyed by asset key, size and format (or by URL for custom
+    banners) and bounded by a total byte budget, evicting least recently
+    used first. After `fresh_for` seconds an entry is revalidated with
+    If-None-Match; a 304 keeps the cached bytes. Concurrent downloads of
+    the same key share one request.
+    """
+
+    def __init__(self, byte_budget: int, fresh_for: float = 3600.0):
+        self.byte_budget = byte_budget
+        self.fresh_for = fresh_for
+        self._entries: OrderedDict[str, CachedAsset] = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.bytes_downloaded = 0
+
+    def _store(self, key: str, entry: CachedAsset):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old.data)
+        if len(entry.data) > self.byte_budget:
+            return
+        self._entries[key] = entry
+        self._bytes += len(entry.data)
+        while self._bytes > self.byte_budget:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.data)
+
+    async def get(
+        self, session: aiohttp.ClientSession, url: str, key: str | None = None
+    ) -> bytes | None:
+        key = key or url
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.checked_at < self.fresh_for:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.data
+
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            data = await self._fetch(session, url, key, entry)
+            future.set_result(data)
+            return data
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # Hand concurrent waiters the same error; mark it retrieved so an
+            # unawaited future doesn't log "exception was never retrieved".
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _fetch(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        key: str,
+        entry: CachedAsset | None,
+    ) -> bytes | None:
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and entry is not None:
+                    self.revalidated += 1
+                    self._store(key, entry._replace(checked_at=time.monotonic()))
+                    return entry.data
+                response.raise_for_status()
+                data = await response.read()
+                etag = response.headers.get("ETag")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error downloading image from {url}: {e!r}")
+            # A stale copy beats no image at all.
+            return entry.data if entry is not None else None
+        self.misses += 1
+        self.bytes_downloaded += len(data)
+        self._store(key, CachedAsset(data, etag, time.monotonic()))
+        return data
+
+    async def fetch(
+        self, session: aiohttp.ClientSession, source: discord.Asset | str | None
+    ) -> bytes | None:
+        """Bytes for a Discord asset or a plain URL."""
+        if not source:
+            return None
+        if isinstance(source, discord.Asset):
+            return await self.get(session, source.url, asset_cache_key(source))
+        return await self.get(session, source)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.revalidated
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "byte_budget": self.byte_budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "hit_rate": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+            "bytes_downloaded": self.bytes_downloaded,
+        }
+
+
+asset_cache = AssetCache(
+    byte_budget=int(os.getenv("ASSET_CACHE_BYTES", str(64 * 1024 * 1024))),
+    fresh_for=float(os.getenv("ASSET_CACHE_FRESH_SECONDS", "3600")),
+)
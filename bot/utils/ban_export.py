@@ -0,0 +1,60 @@
+# bot/utils/ban_export.py
+import csv
+import io
+import json
+import tempfile
+from datetime import datetime
+
+from .database import iter_ban_history
+
+EXPORT_FIELDS = [
+    "guild_id",
+    "guild_name",
+    "user_id",
+    "moderator_id",
+    "reason",
+    "type",
+    "active",
+    "timestamp",
+    "unban_timestamp",
+]
+
+# Exports stay in memory up to this size, then spill to a temporary file.
+SPOOL_MAX_BYTES = 1024 * 1024
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def export_ban_history(fmt: str = "csv", **filters) -> tuple[io.IOBase, int]:
+    """Stream matching ban records into a file object ready for discord.File.
+
+    `fmt` is "csv" or "ndjson"; `filters` are passed to iter_ban_history.
+    Returns the file (rewound) and the number of records written.
+    """
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    row_buffer = io.StringIO()
+    writer = csv.writer(row_buffer)
+    count = 0
+
+    if fmt == "csv":
+        writer.writerow(EXPORT_FIELDS)
+        out.write(row_buffer.getvalue().encode("utf-8"))
+
+    async for record in iter_ban_history(**filters):
+        values = {field: _export_value(record.get(field)) for field in EXPORT_FIELDS}
+        if fmt == "csv":
+            row_buffer.seek(0)
+            row_buffer.truncate()
+            writer.writerow(values.values())
+            line = row_buffer.getvalue()
+        else:
+            line = json.dumps(values, ensure_ascii=False) + "\n"
+        out.write(line.encode("utf-8"))
+        count += 1
+
+    out.seek(0)
+    return out, count
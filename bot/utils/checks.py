@@ -2,7 +2,7 @@ import os
 import discord
 from discord import app_commands
 from dotenv import load_dotenv
-from .database import db
+from .permissions import permission_resolver
 
 load_dotenv()
 BOT_OWNER_IDS = [
@@ -10,7 +10,6 @@ BOT_OWNER_IDS = [
     for owner_id in os.getenv("BOT_OWNER_IDS", "").split(",")
     if owner_id.strip()
 ]
-config_collection = db["guilds"]
 
 
 def is_guild_admin():
@@ -22,16 +21,7 @@ def is_guild_admin():
 
 def is_bot_manager():
     async def predicate(interaction: discord.Interaction):
-        if interaction.user.guild_permissions.administrator:
-            return True
-
-        doc = await config_collection.find_one({"guild_id": interaction.guild.id})
-        role_id = doc.get("bot_manager_role") if doc else None
-        if role_id:
-            role = interaction.guild.get_role(int(role_id))
-            return role in interaction.user.roles
-
-        return False
+        return await permission_resolver.is_bot_manager(interaction.user)
 
     return app_commands.check(predicate)
 
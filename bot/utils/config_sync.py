@@ -0,0 +1,167 @@
+# bot/utils/config_sync.py
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Raised by a standalone mongod: "$changeStream is only supported on replica sets"
+CHANGE_STREAM_UNSUPPORTED_CODES = {40573}
+
+
+class GuildConfigSubscriber:
+    """Keeps the in-process guild config cache in sync with writes made by
+    other bot processes.
+
+    Uses a change stream on `guild_configs` when the server supports it and
+    falls back to polling `updated_at` on a standalone mongod. `collection`
+    only needs `watch()`/`find()`, so any replica-set stand-in works.
+
+    `updated_at` must be set by the server (`$currentDate`) so writers'
+    clocks don't matter. Each poll re-reads the last `poll_interval`
+    seconds so writes that commit out of timestamp order aren't missed;
+    documents already applied at the same `updated_at` are skipped.
+    """
+
+    def __init__(self, collection, on_change, poll_interval: float = 5.0):
+        self.collection = collection
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.mode = None
+        self.events = 0
+        self.last_lag = None
+        self.max_lag = 0.0
+        self._lag_total = 0.0
+        self._lag_samples = 0
+        self._resume_token = None
+        self._last_seen = None
+        # _id -> updated_at of documents applied within the overlap window.
+        self._applied: dict = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "events": self.events,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "avg_lag": (
+                self._lag_total / self._lag_samples if self._lag_samples else None
+            ),
+        }
+
+    async def _run(self):
+        backoff = 1.0
+        while True:
+            try:
+                if self.mode == "polling":
+                    await self._poll()
+                else:
+                    await self._watch()
+                backoff = 1.0
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAM_UNSUPPORTED_CODES:
+                    logger.warning(
+                        "Change streams unavailable, polling guild_configs instead."
+                    )
+                    self.mode = "polling"
+                    continue
+                logger.error(f"Guild config subscriber failed: {e}")
+                if self._resume_token is not None:
+                    # Most likely the token fell off the oplog (e.g.
+                    # ChangeStreamHistoryLost after an outage). Start a fresh
+                    # stream, and drop every cached config since events
+                    # in between were missed.
+                    self._resume_token = None
+                    self._record(None, None)
+            except Exception as e:
+                logger.error(f"Guild config subscriber error: {e}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    async def _watch(self):
+        async with self.collection.watch(
+            full_document="updateLookup", resume_after=self._resume_token
+        ) as stream:
+            self.mode = "change_stream"
+            async for change in stream:
+                self._resume_token = stream.resume_token
+                operation = change.get("operationType")
+                if operation == "invalidate":
+                    self._resume_token = None
+                    return
+                doc = change.get("fullDocument")
+                if operation == "delete" or doc is None:
+                    # Deletes only carry `_id`, so drop everything we hold.
+                    self._record(None, change.get("wallTime"))
+                    continue
+                self._record(doc, doc.get("updated_at") or change.get("wallTime"))
+
+    async def _poll(self):
+        if self._last_seen is None:
+            latest = await self.collection.find_one(
+                {"updated_at": {"$exists": True}},
+                projection={"updated_at": 1},
+                sort=[("updated_at", -1)],
+            )
+            if latest is None:
+                self._last_seen = datetime(1970, 1, 1)
+            else:
+                self._last_seen = latest["updated_at"]
+                self._applied[latest["_id"]] = latest["updated_at"]
+        overlap = timedelta(seconds=self.poll_interval)
+        while True:
+            since = self._last_seen - overlap
+            cursor = self.collection.find(
+                {"updated_at": {"$gte": since}}
+            ).sort("updated_at", 1)
+            async for doc in cursor:
+                doc_id, written_at = doc["_id"], doc["updated_at"]
+                if self._applied.get(doc_id) == written_at:
+                    continue
+                self._applied[doc_id] = written_at
+                self._last_seen = max(self._last_seen, written_at)
+                self._record(doc, written_at)
+            self._applied = {
+                doc_id: written_at
+                for doc_id, written_at in self._applied.items()
+                if written_at >= since
+            }
+            await asyncio.sleep(self.poll_interval)
+
+    def _record(self, doc: dict | None, written_at: datetime | None):
+        self.events += 1
+        if isinstance(written_at, datetime):
+            if written_at.tzinfo is not None:
+                written_at = written_at.replace(tzinfo=None) - (written_at.utcoffset())
+            lag = max((datetime.utcnow() - written_at).total_seconds(), 0.0)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self._lag_total += lag
+            self._lag_samples += 1
+        try:
+            self.on_change(doc.get("guild_id") if doc else None, doc)
+        except Exception as e:
+            logger.error(f"Failed to apply guild config change: {e}")
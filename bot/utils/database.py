@@ -1,18 +1,65 @@
 # bot/utils/database.py
+import asyncio
+import copy
+import logging
 import os
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from dotenv import load_dotenv
 from datetime import datetime
 
+from .cache import TTLCache
+from .config_sync import GuildConfigSubscriber
+from .tracked_config import TrackedConfig, apply_changes, merge_changes
+
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
 mongo_client = AsyncIOMotorClient(os.getenv("MONGODB_URI"))
-config_collection = mongo_client[MONGO_DB_NAME]["guild_configs"]
-bans_collection = mongo_client[MONGO_DB_NAME]["bans"]
+db = mongo_client[MONGO_DB_NAME]
+config_collection = db["guild_configs"]
+bans_collection = db["bans"]
+guilds_collection = db["guilds"]
+
+# Guild configs are read on every gateway event but change rarely, so keep
+# them in-process. Writes go through update_guild_data, which keeps the
+# cached copy current.
+guild_config_cache = TTLCache(
+    maxsize=int(os.getenv("GUILD_CONFIG_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("GUILD_CONFIG_CACHE_TTL", "600")),
+)
+# Named field subsets (see get_guild_data's `fields`), keyed (guild_id, fields).
+guild_slice_cache = TTLCache(
+    maxsize=int(os.getenv("GUILD_CONFIG_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("GUILD_CONFIG_CACHE_TTL", "600")),
+)
+_slice_keys: dict[int, set] = {}
+
+# Bumped whenever a guild's cached config changes (or everything is dropped),
+# so derived caches can tell when they are stale; see get_config_version.
+_config_versions: dict[int, int] = {}
+_config_epoch = 0
+
+# Settings edits for the same guild arriving within this window share a write.
+CONFIG_WRITE_COALESCE_WINDOW = float(os.getenv("CONFIG_WRITE_COALESCE_WINDOW", "0.2"))
+_pending_writes: dict[int, dict] = {}
+
+# `_id` is never used by the bot, so it isn't fetched or cached.
+CONFIG_PROJECTION = {"_id": 0}
+
+# Bump whenever DEFAULT_CONFIG gains keys or stored documents need reshaping;
+# migrate_guild_configs() then upgrades every document once at startup.
+SCHEMA_VERSION = 4
 
 DEFAULT_CONFIG = {
     "auto_link_fix": True,
     "preserve_original_link": True,
+    "resolve_short_links": False,
+    # "webhook": repost as the author; "reply": suppress embeds and reply.
+    "link_fix_mode": "webhook",
     "allowed_channels": [],
     "allow_channels": [],
     "allowed_roles": [],
@@ -31,27 +78,62 @@ DEFAULT_CONFIG = {
         "Tiktok": True,
         "Twitch": True,
     },
+    # `subdomains` lists the subdomains that are fixed as well; any other
+    # subdomain is left alone. `keep_subdomains` ones survive the rewrite.
     "platform_replacements": {
-        "twitter.com": {"replacement": "fxtwitter.com", "label": "Twitter/X"},
-        "x.com": {"replacement": "fixupx.com", "label": "Twitter/X"},
+        "twitter.com": {
+            "replacement": "fxtwitter.com",
+            "label": "Twitter/X",
+            "subdomains": ["mobile", "m"],
+        },
+        "x.com": {
+            "replacement": "fixupx.com",
+            "label": "Twitter/X",
+            "subdomains": ["mobile", "m"],
+        },
         "bsky.app": {"replacement": "fxbsky.app", "label": "Bluesky"},
-        "instagram.com": {"replacement": "ddinstagram.com", "label": "Instagram"},
-        "youtube.com": {"replacement": "koutube.com", "label": "Youtube"},
+        "instagram.com": {
+            "replacement": "ddinstagram.com",
+            "label": "Instagram",
+            "subdomains": ["m"],
+        },
+        "youtube.com": {
+            "replacement": "koutube.com",
+            "label": "Youtube",
+            "subdomains": ["m", "music"],
+        },
         "youtu.be": {"replacement": "koutube.com", "label": "Youtube"},
-        "reddit.com": {"replacement": "rxddit.com", "label": "Reddit"},
+        "reddit.com": {
+            "replacement": "rxddit.com",
+            "label": "Reddit",
+            "subdomains": ["old", "new", "m", "np"],
+        },
         "pixiv.net": {"replacement": "phixiv.net", "label": "Pixiv"},
         "open.spotify.com": {
             "replacement": "open.fxspotify.com",
             "label": "Spotify",
             "path_prefix": "/track",
         },
-        "bilibili.com": {"replacement": "vxbilibili.com", "label": "Bilibili"},
+        "bilibili.com": {
+            "replacement": "vxbilibili.com",
+            "label": "Bilibili",
+            "subdomains": ["m"],
+        },
         "threads.net": {"replacement": "fixthreads.net", "label": "Thread"},
         "threads.com": {"replacement": "fixthreads.net", "label": "Thread"},
         "mastodon.social": {"replacement": "fxmastodon.net", "label": "Mastodon"},
         "deviantart.com": {"replacement": "fixdeviantart.com", "label": "DeviantArt"},
-        "tiktok.com": {"replacement": "fixtiktok.com", "label": "Tiktok"},
-        "twitch.tv": {"replacement": "fxtwitch.com", "label": "Twitch"},
+        "tiktok.com": {
+            "replacement": "fixtiktok.com",
+            "label": "Tiktok",
+            "subdomains": ["m", "vm", "vt"],
+            "keep_subdomains": ["vm", "vt"],
+        },
+        "twitch.tv": {
+            "replacement": "fxtwitch.com",
+            "label": "Twitch",
+            "subdomains": ["m"],
+        },
     },
     "custom_banner_url": None,
     "generate_gif_profile_image": True,
@@ -76,55 +158,439 @@ DEFAULT_CONFIG = {
 }
 
 
-async def get_guild_data(guild_id: int) -> dict:
-    doc = await config_collection.find_one({"guild_id": guild_id})
+async def get_guild_data(guild_id: int, fields: tuple | None = None) -> dict:
+    """Return the guild's config.
+
+    Without `fields`, the full document is returned as a TrackedConfig that
+    may be edited and passed to update_guild_data. With `fields`, only those
+    top-level keys are fetched and cached; the result is shared with the
+    cache and must be treated as read-only.
+    """
+    if fields is not None:
+        return await _get_guild_slice(guild_id, tuple(fields))
+
+    cached = guild_config_cache.get(guild_id)
+    if cached is None:
+        cached = await _load_guild_data(guild_id)
+        guild_config_cache.set(guild_id, cached)
+    # Callers mutate the returned config and hand it back to
+    # update_guild_data, which writes only the fields that changed.
+    return TrackedConfig(cached)
+
+
+async def _get_guild_slice(guild_id: int, fields: tuple) -> dict:
+    full = guild_config_cache.peek(guild_id)
+    if full is not None:
+        return {field: full[field] for field in fields if field in full}
+
+    key = (guild_id, fields)
+    cached = guild_slice_cache.get(key)
+    if cached is not None:
+        return cached
+
+    projection = {field: 1 for field in fields}
+    projection.update({"_id": 0, "schema_version": 1})
+    doc = await config_collection.find_one(
+        {"guild_id": guild_id}, projection=projection
+    )
+    if doc is None or doc.get("schema_version", 0) < SCHEMA_VERSION:
+        # Missing or outdated documents go through the full path once.
+        full = await _load_guild_data(guild_id)
+        guild_config_cache.set(guild_id, full)
+        return {field: full[field] for field in fields if field in full}
+
+    doc = {field: doc[field] for field in fields if field in doc}
+    guild_slice_cache.set(key, doc)
+    _slice_keys.setdefault(guild_id, set()).add(key)
+    return doc
+
+
+def _update_slices(guild_id: int, sets: dict, unsets):
+    for key in _slice_keys.get(guild_id, ()):
+        cached = guild_slice_cache.peek(key)
+        if cached is None:
+            continue
+        fields = key[1]
+        guild_slice_cache.set(
+            key,
+            apply_changes(
+                cached,
+                {p: v for p, v in sets.items() if p.split(".", 1)[0] in fields},
+                [p for p in unsets if p.split(".", 1)[0] in fields],
+            ),
+        )
+
+
+def _drop_slices(guild_id: int):
+    for key in _slice_keys.pop(guild_id, ()):
+        guild_slice_cache.pop(key)
+
+
+async def _load_guild_data(guild_id: int) -> dict:
+    doc = await config_collection.find_one(
+        {"guild_id": guild_id}, projection=CONFIG_PROJECTION
+    )
     if not doc:
-        new_doc = {"guild_id": guild_id, **DEFAULT_CONFIG}
-        await config_collection.insert_one(new_doc)
-        return new_doc
+        # Two first events for a new guild can both get here; the upsert
+        # lets only one of them create the document, and both re-read it.
+        await config_collection.update_one(
+            {"guild_id": guild_id},
+            {"$setOnInsert": _insert_defaults(())},
+            upsert=True,
+        )
+        doc = await config_collection.find_one(
+            {"guild_id": guild_id}, projection=CONFIG_PROJECTION
+        )
 
-    updated = False
+    if doc.get("schema_version", 0) < SCHEMA_VERSION:
+        # Only documents written after startup by an older process end up
+        # here; everything else was upgraded by migrate_guild_configs().
+        update = _upgrade_guild_doc(doc)
+        await config_collection.update_one({"guild_id": guild_id}, update)
+    return doc
+
+
+async def preload_guild_configs(guild_ids) -> int:
+    """Fill the config cache for `guild_ids` from a single cursor."""
+    loaded = 0
+    cursor = config_collection.find(
+        {"guild_id": {"$in": list(guild_ids)}},
+        projection=CONFIG_PROJECTION,
+        batch_size=500,
+    )
+    async for doc in cursor:
+        # Outdated documents are upgraded lazily by get_guild_data instead.
+        if doc.get("schema_version", 0) >= SCHEMA_VERSION:
+            guild_config_cache.set(doc["guild_id"], doc)
+            loaded += 1
+    return loaded
+
+
+def _upgrade_guild_doc(doc: dict) -> dict:
+    """Bring `doc` up to SCHEMA_VERSION in place and return the matching update."""
+    to_set = {}
     for key, val in DEFAULT_CONFIG.items():
         if key not in doc:
-            doc[key] = val
-            updated = True
-        elif isinstance(val, dict) and isinstance(doc.get(key), dict):
-            for subkey, subval in val.items():
-                if subkey not in doc[key]:
-                    doc[key][subkey] = subval
-                    updated = True
+            doc[key] = copy.deepcopy(val)
+            to_set[key] = doc[key]
+        elif isinstance(val, dict) and isinstance(doc[key], dict):
+            missing = {k: v for k, v in val.items() if k not in doc[key]}
+            if missing:
+                # Sub-keys such as "twitter.com" contain dots and can't be
+                # addressed as a path, so the whole dict is rewritten.
+                doc[key].update(copy.deepcopy(missing))
+                to_set[key] = doc[key]
+
+    replacements = doc.get("platform_replacements")
+    if doc.get("schema_version", 0) < 4 and isinstance(replacements, dict):
+        # Stored entries predate the subdomain allowlists, which the loop
+        # above doesn't reach because the domain keys already exist.
+        for domain, default in DEFAULT_CONFIG["platform_replacements"].items():
+            entry = replacements.get(domain)
+            if not isinstance(entry, dict) or "subdomains" in entry:
+                continue
+            for key in ("subdomains", "keep_subdomains"):
+                if key in default:
+                    entry[key] = list(default[key])
+            to_set["platform_replacements"] = replacements
 
+    doc["schema_version"] = SCHEMA_VERSION
+    to_set["schema_version"] = SCHEMA_VERSION
+    update = {"$set": to_set}
     if "custom_avatar_url" in doc:
-        await config_collection.update_one(
-            {"guild_id": guild_id}, {"$unset": {"custom_avatar_url": ""}}
-        )
         del doc["custom_avatar_url"]
-        updated = True
+        update["$unset"] = {"custom_avatar_url": ""}
+    return update
 
-    if updated:
-        await config_collection.update_one({"guild_id": guild_id}, {"$set": doc})
-    return doc
+
+async def migrate_guild_configs(batch_size: int = 500) -> int:
+    """Upgrade every stored guild config to SCHEMA_VERSION. Returns the count."""
+    migrated = 0
+    operations = []
+    cursor = config_collection.find(
+        {"schema_version": {"$not": {"$gte": SCHEMA_VERSION}}}
+    )
+    async for doc in cursor:
+        operations.append(UpdateOne({"_id": doc["_id"]}, _upgrade_guild_doc(doc)))
+        if len(operations) >= batch_size:
+            await config_collection.bulk_write(operations, ordered=False)
+            migrated += len(operations)
+            operations = []
+    if operations:
+        await config_collection.bulk_write(operations, ordered=False)
+        migrated += len(operations)
+    return migrated
+
+
+def _insert_defaults(paths) -> dict:
+    """Defaults for an upserted document, minus anything `paths` already touch."""
+    touched = {path.split(".", 1)[0] for path in paths}
+    defaults = {
+        key: copy.deepcopy(val)
+        for key, val in DEFAULT_CONFIG.items()
+        if key not in touched
+    }
+    defaults["schema_version"] = SCHEMA_VERSION
+    return defaults
 
 
 async def update_guild_data(guild_id: int, data: dict):
-    if "custom_avatar_url" in data:
+    if isinstance(data, TrackedConfig):
+        sets, unsets = data.changes()
+        data.mark_saved()
+    else:
+        sets, unsets = dict(data), []
+    if "custom_avatar_url" in sets:
         print(
             f"Debug: Removing 'custom_avatar_url' from update data for guild {guild_id}."
         )
-        del data["custom_avatar_url"]
-    await config_collection.update_one(
-        {"guild_id": guild_id}, {"$set": data}, upsert=True
-    )
+        del sets["custom_avatar_url"]
+    if not sets and not unsets:
+        return
+
+    cached = guild_config_cache.peek(guild_id)
+    if cached is not None:
+        guild_config_cache.set(guild_id, apply_changes(cached, sets, unsets))
+    _update_slices(guild_id, sets, unsets)
+    _bump_config_version(guild_id)
+
+    pending = _pending_writes.get(guild_id)
+    if pending is None:
+        pending = _pending_writes[guild_id] = {
+            "$set": {},
+            "$unset": set(),
+            "future": asyncio.get_running_loop().create_future(),
+        }
+        asyncio.create_task(_flush_guild_write(guild_id))
+    merge_changes(pending["$set"], pending["$unset"], sets, unsets)
+    await asyncio.shield(pending["future"])
+
+
+async def _flush_guild_write(guild_id: int):
+    # Edits that land inside the window are folded into a single update_one.
+    await asyncio.sleep(CONFIG_WRITE_COALESCE_WINDOW)
+    pending = _pending_writes.pop(guild_id)
+    sets = pending["$set"]
+    update = {
+        "$set": sets,
+        "$setOnInsert": _insert_defaults([*sets, *pending["$unset"]]),
+        # `updated_at` lets other processes poll for changes and measure lag.
+        # Server time, so it is comparable across writers.
+        "$currentDate": {"updated_at": True},
+    }
+    if pending["$unset"]:
+        update["$unset"] = {path: "" for path in pending["$unset"]}
+    try:
+        await config_collection.update_one({"guild_id": guild_id}, update, upsert=True)
+    except Exception as e:
+        # Drop the write-through copy so the next read sees what was stored.
+        invalidate_guild_data(guild_id)
+        pending["future"].set_exception(e)
+    else:
+        pending["future"].set_result(None)
+
+
+def get_config_version(guild_id: int) -> tuple[int, int]:
+    """Opaque token that changes whenever the guild's config may have changed."""
+    return _config_epoch, _config_versions.get(guild_id, 0)
+
+
+def _bump_config_version(guild_id: int):
+    _config_versions[guild_id] = _config_versions.get(guild_id, 0) + 1
+
+
+def invalidate_guild_data(guild_id: int):
+    guild_config_cache.pop(guild_id)
+    _drop_slices(guild_id)
+    _bump_config_version(guild_id)
+
+
+def apply_guild_config_change(guild_id: int | None, doc: dict | None):
+    """Called by the config subscriber when another process writes a config."""
+    global _config_epoch
+    if guild_id is None:
+        guild_config_cache.clear()
+        guild_slice_cache.clear()
+        _slice_keys.clear()
+        _config_epoch += 1
+        return
+    if doc is None:
+        invalidate_guild_data(guild_id)
+        return
+    doc.pop("_id", None)
+    if guild_id in guild_config_cache:
+        guild_config_cache.set(guild_id, doc)
+    for key in _slice_keys.get(guild_id, ()):
+        if key in guild_slice_cache:
+            guild_slice_cache.set(key, {f: doc[f] for f in key[1] if f in doc})
+    _bump_config_version(guild_id)
+
+
+config_subscriber = GuildConfigSubscriber(
+    config_collection,
+    apply_guild_config_change,
+    poll_interval=float(os.getenv("GUILD_CONFIG_POLL_INTERVAL", "5")),
+)
+
+
+def get_guild_cache_stats() -> dict:
+    return guild_config_cache.stats()
+
+
+# Guild IDs with an active server ban. Always replaced as a whole, never
+# mutated, so readers see either the old or the new set.
+_banned_guild_ids: frozenset = frozenset()
+_banned_guilds_loaded = False
+# Bumped by every local ban change; reconciliation skips a round if its
+# snapshot raced with one.
+_ban_set_version = 0
+
+
+def _set_server_banned(guild_id: int, banned: bool):
+    global _banned_guild_ids, _ban_set_version
+    if banned:
+        _banned_guild_ids = _banned_guild_ids | {guild_id}
+    else:
+        _banned_guild_ids = _banned_guild_ids - {guild_id}
+    _ban_set_version += 1
+
+
+class BanAuditQueue:
+    """Write-behind buffer for ban records.
+
+    Records are written with insert_many once `max_batch` are queued or
+    `flush_interval` seconds after the first one, whichever comes first.
+    Call `close()` on shutdown so nothing queued is lost.
+
+    insert_many assigns each record's `_id` before sending, so a retried
+    record that was already stored fails with a duplicate key error and is
+    counted as written. A record the server rejects for any other reason is
+    retried `max_attempts` times and then moved to `rejected`.
+    """
+
+    def __init__(
+        self,
+        collection,
+        max_batch: int = 50,
+        flush_interval: float = 1.0,
+        max_attempts: int = 3,
+    ):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        # (record, failed attempts so far)
+        self._buffer: list[tuple[dict, int]] = []
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+        self.rejected: list[dict] = []
+        self.flushes = 0
+        self.written = 0
+        self.failures = 0
+        self.last_flush_latency = None
+        self.max_flush_latency = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffer)
+
+    def put(self, record: dict):
+        self._buffer.append((record, 0))
+        if len(self._buffer) >= self.max_batch:
+            asyncio.create_task(self.flush())
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    def _retry_later(self):
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def flush(self):
+        async with self._lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return
+            started = time.perf_counter()
+            try:
+                await self.collection.insert_many(
+                    [record for record, _ in batch], ordered=False
+                )
+            except BulkWriteError as e:
+                self.failures += 1
+                retry = []
+                failed = 0
+                for error in e.details.get("writeErrors", []):
+                    if error.get("code") == 11000:
+                        # Stored by an earlier attempt whose reply was lost.
+                        continue
+                    failed += 1
+                    record, attempts = batch[error["index"]]
+                    if attempts + 1 >= self.max_attempts:
+                        self.rejected.append(record)
+                        logger.error(
+                            f"Giving up on ban record {record.get('_id')}: "
+                            f"{error.get('errmsg')}"
+                        )
+                    else:
+                        retry.append((record, attempts + 1))
+                self.written += len(batch) - failed
+                if retry:
+                    self._buffer[:0] = retry
+                    self._retry_later()
+                return
+            except Exception as e:
+                # Nothing is known to be stored; the next flush retries it all.
+                self._buffer[:0] = batch
+                self.failures += 1
+                logger.error(f"Failed to write {len(batch)} ban record(s): {e}")
+                self._retry_later()
+                return
+            latency = time.perf_counter() - started
+            self.flushes += 1
+            self.written += len(batch)
+            self.last_flush_latency = latency
+            self.max_flush_latency = max(self.max_flush_latency, latency)
+
+    async def close(self):
+        if self._timer and not self._timer.done():
+            self._timer.cancel()
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "flushes": self.flushes,
+            "written": self.written,
+            "failures": self.failures,
+            "rejected": len(self.rejected),
+            "last_flush_latency": self.last_flush_latency,
+            "max_flush_latency": self.max_flush_latency,
+        }
+
+
+ban_audit_queue = BanAuditQueue(
+    bans_collection,
+    max_batch=int(os.getenv("BAN_AUDIT_BATCH_SIZE", "50")),
+    flush_interval=float(os.getenv("BAN_AUDIT_FLUSH_INTERVAL", "1")),
+)
 
 
 async def log_ban(ban_data: dict):
     if "active" not in ban_data:
         ban_data["active"] = True
     ban_data["timestamp"] = datetime.utcnow()
-    await bans_collection.insert_one(ban_data)
+    ban_audit_queue.put(ban_data)
+    if ban_data.get("type") == "server" and ban_data["active"]:
+        _set_server_banned(ban_data["guild_id"], True)
 
 
 async def is_server_banned(guild_id: int) -> bool:
+    if _banned_guilds_loaded:
+        return guild_id in _banned_guild_ids
     ban_record = await bans_collection.find_one(
         {"guild_id": guild_id, "type": "server", "active": True}
     )
@@ -132,13 +598,105 @@ async def is_server_banned(guild_id: int) -> bool:
 
 
 async def unban_server(guild_id: int):
+    # A server ban still in the audit buffer would miss the update below and
+    # be stored later as active.
+    await ban_audit_queue.flush()
     await bans_collection.update_many(
         {"guild_id": guild_id, "type": "server", "active": True},
         {"$set": {"active": False, "unban_timestamp": datetime.utcnow()}},
     )
+    _set_server_banned(guild_id, False)
+
 
+async def reconcile_banned_guilds() -> int | None:
+    """Reload the banned-guild set from `bans`.
 
-async def get_banned_servers() -> list:
-    return await bans_collection.find({"type": "server", "active": True}).to_list(
-        length=None
+    Returns how many guild IDs differed from the in-memory set, or None if a
+    local ban change raced with the query and the round was skipped.
+    """
+    global _banned_guild_ids, _banned_guilds_loaded
+    # Queued server bans must be stored before the collection is trusted.
+    await ban_audit_queue.flush()
+    version = _ban_set_version
+    stored = frozenset(
+        await bans_collection.distinct("guild_id", {"type": "server", "active": True})
     )
+    if version != _ban_set_version:
+        return None
+    drift = len(stored ^ _banned_guild_ids)
+    _banned_guild_ids = stored
+    _banned_guilds_loaded = True
+    return drift
+
+
+def _ban_history_filter(
+    guild_id: int | None,
+    ban_type: str | None,
+    moderator_id: int | None,
+    active: bool | None,
+    after: tuple | None,
+) -> dict:
+    query = {}
+    if guild_id is not None:
+        query["guild_id"] = guild_id
+    if ban_type is not None:
+        query["type"] = ban_type
+    if moderator_id is not None:
+        query["moderator_id"] = moderator_id
+    if active is not None:
+        query["active"] = active
+    if after is not None:
+        # Keyset pagination: resume strictly after (guild_id, timestamp, _id).
+        last_guild, last_time, last_id = after
+        same_guild = [
+            {"timestamp": {"$gt": last_time}},
+            {"timestamp": last_time, "_id": {"$gt": last_id}},
+        ]
+        if guild_id is not None:
+            query["$or"] = same_guild
+        else:
+            query["$or"] = [
+                {"guild_id": {"$gt": last_guild}},
+                *({"guild_id": last_guild, **cond} for cond in same_guild),
+            ]
+    return query
+
+
+async def get_ban_history_page(
+    guild_id: int | None = None,
+    ban_type: str | None = None,
+    moderator_id: int | None = None,
+    active: bool | None = None,
+    after: tuple | None = None,
+    limit: int = 100,
+) -> tuple[list, tuple | None]:
+    """One page of ban records ordered by (guild_id, timestamp).
+
+    Returns the records and the cursor to pass as `after` for the next page,
+    or None once there are no more records.
+    """
+    cursor = bans_collection.find(
+        _ban_history_filter(guild_id, ban_type, moderator_id, active, after),
+        sort=[("guild_id", 1), ("timestamp", 1), ("_id", 1)],
+        limit=limit,
+    )
+    records = await cursor.to_list(length=limit)
+    if len(records) < limit:
+        return records, None
+    last = records[-1]
+    return records, (last["guild_id"], last["timestamp"], last["_id"])
+
+
+async def iter_ban_history(page_size: int = 500, **filters):
+    """Yield every matching ban record, one keyset page at a time."""
+    # Include bans still waiting in the audit buffer.
+    await ban_audit_queue.flush()
+    after = None
+    while True:
+        records, after = await get_ban_history_page(
+            after=after, limit=page_size, **filters
+        )
+        for record in records:
+            yield record
+        if after is None:
+            return
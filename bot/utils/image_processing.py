@@ -2,6 +2,7 @@
 import io
 import logging
 import os
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageSequence
 import imageio.v3 as iio
 
@@ -23,6 +24,112 @@ TEXT_COLOR = (255, 255, 255, 255)
 LINE_SPACING = 15
 
 
+# Static template layers. They only depend on sizes and colours, so each is
+# built once per argument tuple and shared by every render and GIF frame.
+# Callers must treat the returned images as read-only.
+@lru_cache(maxsize=8)
+def misty_layer(width: int, height: int, color: tuple) -> Image.Image:
+    return Image.new("RGBA", (width, height), color)
+
+
+@lru_cache(maxsize=8)
+def border_overlay(
+    width: int, height: int, border_width: int, color: tuple, inner_corner_radius: int
+) -> Image.Image:
+    overlay = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    border_base = Image.new("RGBA", (width, height), color)
+    inner_mask = Image.new("L", (width, height), 0)
+    draw_inner_mask = ImageDraw.Draw(inner_mask)
+
+    inner_x1 = border_width
+    inner_y1 = border_width
+    inner_x2 = width - border_width
+    inner_y2 = height - border_width
+
+    draw_inner_mask.rounded_rectangle(
+        (inner_x1, inner_y1, inner_x2, inner_y2),
+        radius=inner_corner_radius,
+        fill=255,
+    )
+    border_base.paste((0, 0, 0, 0), (0, 0), inner_mask)
+    overlay.paste(border_base, (0, 0), border_base)
+    return overlay
+
+
+@lru_cache(maxsize=8)
+def circle_mask(size: int) -> Image.Image:
+    """Anti-aliased circular mask, drawn at 4x and downsampled."""
+    mask_size = size * 4
+    mask = Image.new("L", (mask_size, mask_size), 0)
+    draw_mask = ImageDraw.Draw(mask)
+    draw_mask.ellipse((0, 0, mask_size, mask_size), fill=255)
+    return mask.resize((size, size), Image.Resampling.LANCZOS)
+
+
+@lru_cache(maxsize=8)
+def avatar_shadow_canvas(size: int, border_width: int) -> Image.Image:
+    """Transparent avatar canvas with the blurred drop shadow already on it."""
+    shadow_spread = border_width * 2.0
+    shadow_blur_radius = border_width * 1.5
+    shadow_offset_x = border_width * 0.75
+    shadow_offset_y = border_width * 0.75
+    shadow_alpha = 150
+
+    canvas_size = int(size + shadow_spread * 2)
+    composite_image = Image.new("RGBA", (canvas_size, canvas_size), (0, 0, 0, 0))
+
+    shadow_base_size = int(size + shadow_spread)
+    shadow_source_canvas_size = int(shadow_base_size + shadow_blur_radius * 2)
+    raw_shadow_source = Image.new(
+        "RGBA", (shadow_source_canvas_size, shadow_source_canvas_size), (0, 0, 0, 0)
+    )
+    draw_raw_shadow = ImageDraw.Draw(raw_shadow_source)
+
+    ellipse_x1 = (shadow_source_canvas_size - shadow_base_size) / 2
+    ellipse_y1 = (shadow_source_canvas_size - shadow_base_size) / 2
+    ellipse_x2 = ellipse_x1 + shadow_base_size
+    ellipse_y2 = ellipse_y1 + shadow_base_size
+
+    draw_raw_shadow.ellipse(
+        (ellipse_x1, ellipse_y1, ellipse_x2, ellipse_y2),
+        fill=(0, 0, 0, shadow_alpha),
+    )
+
+    shadow_blurred = raw_shadow_source.filter(
+        ImageFilter.GaussianBlur(radius=shadow_blur_radius)
+    )
+
+    shadow_paste_x = int(
+        (canvas_size - shadow_source_canvas_size) / 2 + shadow_offset_x
+    )
+    shadow_paste_y = int(
+        (canvas_size - shadow_source_canvas_size) / 2 + shadow_offset_y
+    )
+
+    composite_image.paste(
+        shadow_blurred, (shadow_paste_x, shadow_paste_y), shadow_blurred
+    )
+    return composite_image
+
+
+# (font list key, char) -> index of the first font in the list that has a
+# glyph for char. Shared by every ImageProcessor in the process.
+_glyph_font_index: dict[tuple, int] = {}
+
+
+def _font_list_key(font_list) -> tuple:
+    return tuple(
+        (getattr(font, "path", None) or id(font), getattr(font, "size", None))
+        for font in font_list
+    )
+
+
+def clear_layer_caches():
+    for cached in (misty_layer, border_overlay, circle_mask, avatar_shadow_canvas):
+        cached.cache_clear()
+    _glyph_font_index.clear()
+
+
 class ImageProcessor:
     def __init__(self):
         self.username_fonts = self._load_fonts(USERNAME_FONT_SIZE)
@@ -47,10 +154,16 @@ class ImageProcessor:
         return fonts
 
     def _get_font_for_char(self, char: str, font_list: list[ImageFont.FreeTypeFont]):
-        for font in font_list:
-            if font.getmask(char).getbbox():
-                return font
-        return font_list[0]
+        key = (_font_list_key(font_list), char)
+        index = _glyph_font_index.get(key)
+        if index is None:
+            index = 0
+            for i, font in enumerate(font_list):
+                if font.getmask(char).getbbox():
+                    index = i
+                    break
+            _glyph_font_index[key] = index
+        return font_list[index]
 
     def _draw_text_with_fallback(
         self,
@@ -71,55 +184,13 @@ class ImageProcessor:
         self, avatar_img: Image.Image, size: int, border_width: int
     ) -> Image.Image:
         avatar_resized = avatar_img.resize((size, size), Image.Resampling.LANCZOS)
-        mask_size = size * 4
-        mask = Image.new("L", (mask_size, mask_size), 0)
-        draw_mask = ImageDraw.Draw(mask)
-        draw_mask.ellipse((0, 0, mask_size, mask_size), fill=255)
-        mask = mask.resize((size, size), Image.Resampling.LANCZOS)
+        mask = circle_mask(size)
 
         rounded_avatar = Image.new("RGBA", (size, size), (0, 0, 0, 0))
         rounded_avatar.paste(avatar_resized, (0, 0), mask)
 
-        shadow_spread = border_width * 2.0
-        shadow_blur_radius = border_width * 1.5
-        shadow_offset_x = border_width * 0.75
-        shadow_offset_y = border_width * 0.75
-        shadow_alpha = 150
-
-        canvas_size = int(size + shadow_spread * 2)
-        composite_image = Image.new("RGBA", (canvas_size, canvas_size), (0, 0, 0, 0))
-
-        shadow_base_size = int(size + shadow_spread)
-        shadow_source_canvas_size = int(shadow_base_size + shadow_blur_radius * 2)
-        raw_shadow_source = Image.new(
-            "RGBA", (shadow_source_canvas_size, shadow_source_canvas_size), (0, 0, 0, 0)
-        )
-        draw_raw_shadow = ImageDraw.Draw(raw_shadow_source)
-
-        ellipse_x1 = (shadow_source_canvas_size - shadow_base_size) / 2
-        ellipse_y1 = (shadow_source_canvas_size - shadow_base_size) / 2
-        ellipse_x2 = ellipse_x1 + shadow_base_size
-        ellipse_y2 = ellipse_y1 + shadow_base_size
-
-        draw_raw_shadow.ellipse(
-            (ellipse_x1, ellipse_y1, ellipse_x2, ellipse_y2),
-            fill=(0, 0, 0, shadow_alpha),
-        )
-
-        shadow_blurred = raw_shadow_source.filter(
-            ImageFilter.GaussianBlur(radius=shadow_blur_radius)
-        )
-
-        shadow_paste_x = int(
-            (canvas_size - shadow_source_canvas_size) / 2 + shadow_offset_x
-        )
-        shadow_paste_y = int(
-            (canvas_size - shadow_source_canvas_size) / 2 + shadow_offset_y
-        )
-
-        composite_image.paste(
-            shadow_blurred, (shadow_paste_x, shadow_paste_y), shadow_blurred
-        )
+        composite_image = avatar_shadow_canvas(size, border_width).copy()
+        canvas_size = composite_image.width
         avatar_x_pos = int((canvas_size - size) / 2)
         avatar_y_pos = int((canvas_size - size) / 2)
         composite_image.paste(
@@ -135,25 +206,7 @@ class ImageProcessor:
         color: tuple,
         inner_corner_radius: int,
     ) -> Image.Image:
-        overlay = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
-        border_base = Image.new("RGBA", (width, height), color)
-        inner_mask = Image.new("L", (width, height), 0)
-        draw_inner_mask = ImageDraw.Draw(inner_mask)
-
-        inner_x1 = border_width
-        inner_y1 = border_width
-        inner_x2 = width - border_width
-        inner_y2 = height - border_width
-
-        draw_inner_mask.rounded_rectangle(
-            (inner_x1, inner_y1, inner_x2, inner_y2),
-            radius=inner_corner_radius,
-            fill=255,
-        )
-        border_base.paste((0, 0, 0, 0), (0, 0), inner_mask)
-        overlay.paste(border_base, (0, 0), border_base)
-        return overlay
+        return border_overlay(width, height, border_width, color, inner_corner_radius)
 
     def _prepare_banner_frame(self, frame: Image.Image) -> Image.Image:
         original_width, original_height = frame.size
@@ -207,6 +260,7 @@ class ImageProcessor:
         username_line_1: str,
         username_line_2: str,
         display_date_text: str,
+        fill=TEXT_COLOR,
     ):
         sample_font_username1 = (
             self.username_fonts[0] if self.username_fonts else ImageFont.load_default()
@@ -243,14 +297,14 @@ class ImageProcessor:
             (text_x, username_y_1),
             username_line_1,
             self.username_fonts,
-            TEXT_COLOR,
+            fill,
         )
         self._draw_text_with_fallback(
             draw,
             (text_x, username_y_2),
             username_line_2,
             self.discriminator_fonts,
-            TEXT_COLOR,
+            fill,
         )
 
         date_text_bbox = draw.textbbox((0, 0), display_date_text, font=sample_font_date)
@@ -259,8 +313,39 @@ class ImageProcessor:
         date_x = DISCORD_BANNER_WIDTH - date_width - 15
         date_y = DISCORD_BANNER_HEIGHT - date_height - 15
         self._draw_text_with_fallback(
-            draw, (date_x, date_y), display_date_text, self.date_fonts, TEXT_COLOR
+            draw, (date_x, date_y), display_date_text, self.date_fonts, fill
+        )
+
+    def _render_text_layer(
+        self,
+        avatar_final_display_size: int,
+        text_x: int,
+        username_line_1: str,
+        username_line_2: str,
+        display_date_text: str,
+    ) -> tuple[Image.Image | None, tuple]:
+        """All banner text as one RGBA layer (cropped) and its paste offset.
+
+        Glyphs are drawn once into an L mask which becomes the layer's alpha,
+        so each GIF frame only needs a single paste.
+        """
+        mask = Image.new("L", (DISCORD_BANNER_WIDTH, DISCORD_BANNER_HEIGHT), 0)
+        self._draw_profile_text(
+            ImageDraw.Draw(mask),
+            avatar_final_display_size,
+            text_x,
+            username_line_1,
+            username_line_2,
+            display_date_text,
+            fill=255,
         )
+        bbox = mask.getbbox()
+        if bbox is None:
+            return None, (0, 0)
+        mask = mask.crop(bbox)
+        layer = Image.new("RGBA", mask.size, TEXT_COLOR[:3])
+        layer.putalpha(mask)
+        return layer, bbox[:2]
 
     def process_image_sync(
         self,
@@ -288,13 +373,12 @@ class ImageProcessor:
                 banner_is_animated or avatar_is_animated
             )
 
-            temp_processed_avatar = self.round_avatar(
-                avatar_img_raw.copy(), AVATAR_TARGET_SIZE, AVATAR_BORDER_WIDTH
-            )
-            avatar_final_display_size = temp_processed_avatar.width
+            avatar_final_display_size = avatar_shadow_canvas(
+                AVATAR_TARGET_SIZE, AVATAR_BORDER_WIDTH
+            ).width
 
-            misty_layer = Image.new(
-                "RGBA", (DISCORD_BANNER_WIDTH, DISCORD_BANNER_HEIGHT), MISTY_LAYER_COLOR
+            misty = misty_layer(
+                DISCORD_BANNER_WIDTH, DISCORD_BANNER_HEIGHT, MISTY_LAYER_COLOR
             )
 
             username_line_1 = target_user_display_name
@@ -330,6 +414,16 @@ class ImageProcessor:
                 ]
                 max_frames = max(len(banner_frames), len(avatar_frames_processed))
 
+                x_pos = 30
+                y_pos = (DISCORD_BANNER_HEIGHT - avatar_final_display_size) // 2
+                text_layer, text_offset = self._render_text_layer(
+                    avatar_final_display_size,
+                    x_pos + avatar_final_display_size + 20,
+                    username_line_1,
+                    username_line_2,
+                    display_date_text,
+                )
+
                 for i in range(max_frames):
                     current_banner_frame = banner_frames[i % len(banner_frames)]
                     current_avatar_frame = avatar_frames_processed[
@@ -338,24 +432,13 @@ class ImageProcessor:
                     composite_frame = self._prepare_banner_frame(
                         current_banner_frame
                     ).copy()
-                    composite_frame.paste(misty_layer, (0, 0), misty_layer)
+                    composite_frame.paste(misty, (0, 0), misty)
                     composite_frame.paste(border_overlay, (0, 0), border_overlay)
-                    draw = ImageDraw.Draw(composite_frame)
-
-                    x_pos = 30
-                    y_pos = (DISCORD_BANNER_HEIGHT - avatar_final_display_size) // 2
                     composite_frame.paste(
                         current_avatar_frame, (x_pos, y_pos), current_avatar_frame
                     )
-                    text_x = x_pos + avatar_final_display_size + 20
-                    self._draw_profile_text(
-                        draw,
-                        avatar_final_display_size,
-                        text_x,
-                        username_line_1,
-                        username_line_2,
-                        display_date_text,
-                    )
+                    if text_layer is not None:
+                        composite_frame.paste(text_layer, text_offset, text_layer)
                     output_frames.append(composite_frame)
                     banner_frame_duration = banner_durations[i % len(banner_durations)]
                     avatar_frame_duration = avatar_durations[i % len(avatar_durations)]
@@ -377,7 +460,7 @@ class ImageProcessor:
             else:
                 banner_img_final = self._prepare_banner_frame(banner_img)
                 draw = ImageDraw.Draw(banner_img_final)
-                banner_img_final.paste(misty_layer, (0, 0), misty_layer)
+                banner_img_final.paste(misty, (0, 0), misty)
                 banner_img_final.paste(border_overlay, (0, 0), border_overlay)
 
                 if avatar_is_animated:
@@ -0,0 +1,104 @@
+# bot/utils/indexes.py
+import asyncio
+import sys
+from datetime import datetime
+
+from pymongo import ASCENDING, IndexModel
+
+from .database import bans_collection, config_collection
+
+CONFIG_INDEXES = [
+    IndexModel([("guild_id", ASCENDING)], unique=True, name="guild_id_unique"),
+    # Used by the config subscriber when change streams are unavailable.
+    IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+]
+
+BAN_INDEXES = [
+    IndexModel(
+        [("guild_id", ASCENDING), ("type", ASCENDING), ("active", ASCENDING)],
+        name="guild_id_type_active",
+    ),
+    # Keyset order for get_ban_history_page.
+    IndexModel(
+        [("guild_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)],
+        name="guild_id_timestamp",
+    ),
+    # guild_id is included so reconcile_banned_guilds' distinct() is covered.
+    IndexModel(
+        [("type", ASCENDING), ("active", ASCENDING), ("guild_id", ASCENDING)],
+        name="type_active_guild_id",
+    ),
+]
+
+# (description, collection, filter) for every query issued on a hot path.
+HOT_QUERIES = [
+    ("guild_configs by guild_id", config_collection, {"guild_id": 0}),
+    (
+        "guild_configs changed since",
+        config_collection,
+        {"updated_at": {"$gte": datetime(1970, 1, 1)}},
+    ),
+    (
+        "bans: is_server_banned",
+        bans_collection,
+        {"guild_id": 0, "type": "server", "active": True},
+    ),
+    (
+        "bans: active server bans",
+        bans_collection,
+        {"type": "server", "active": True},
+    ),
+    ("bans: guild ban history", bans_collection, {"guild_id": 0}),
+]
+
+
+async def ensure_indexes():
+    await config_collection.create_indexes(CONFIG_INDEXES)
+    await bans_collection.create_indexes(BAN_INDEXES)
+
+
+def _plan_stages(plan) -> list[str]:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def explain_hot_queries() -> list[dict]:
+    """Run explain() on each hot query and report the winning plan's stages."""
+    results = []
+    for description, collection, query in HOT_QUERIES:
+        explain = await collection.find(query).explain()
+        stages = _plan_stages(explain["queryPlanner"]["winningPlan"])
+        results.append(
+            {
+                "query": description,
+                "collection": collection.name,
+                "stages": stages,
+                "collscan": "COLLSCAN" in stages,
+            }
+        )
+    return results
+
+
+async def _main() -> int:
+    await ensure_indexes()
+    results = await explain_hot_queries()
+    for result in results:
+        flag = "COLLSCAN" if result["collscan"] else "ok"
+        print(
+            f"[{flag:>8}] {result['collection']}: {result['query']} "
+            f"-> {' > '.join(result['stages'])}"
+        )
+    return 1 if any(result["collscan"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    # python -m bot.utils.indexes
+    sys.exit(asyncio.run(_main()))
@@ -0,0 +1,156 @@
+# bot/utils/link_resolver.py
+import asyncio
+import logging
+import os
+import re
+
+import aiohttp
+
+from .cache import TTLCache
+from .link_rewriter import URL_PATTERN, canonicalize_url, split_trailing
+
+logger = logging.getLogger(__name__)
+
+# Hosts that only redirect to the real post.
+SHORT_LINK_HOSTS = frozenset(
+    {
+        "t.co",
+        "vm.tiktok.com",
+        "vt.tiktok.com",
+        "redd.it",
+        "b23.tv",
+    }
+)
+
+
+def _split_url(match) -> tuple[str, str]:
+    """The URL in a URL_PATTERN match, and the sentence punctuation after it."""
+    rest, trailing = split_trailing(match.group("rest"))
+    return match.group("scheme") + match.group("host") + rest, trailing
+
+
+class ShortLinkResolver:
+    """Expands short links by following their redirects with HEAD requests.
+
+    At most `max_concurrency` requests run at once, each bounded by
+    `timeout` seconds. Resolved targets are kept in a TTL+LRU cache and
+    concurrent lookups of the same URL share one request, so a popular link
+    is resolved once. Failures resolve to the original URL and are only
+    remembered for `failure_ttl` seconds, so a transient timeout doesn't
+    disable a link for the whole `cache_ttl`.
+    """
+
+    def __init__(
+        self,
+        hosts=SHORT_LINK_HOSTS,
+        max_concurrency: int = 8,
+        timeout: float = 5.0,
+        max_redirects: int = 5,
+        cache_size: int = 4096,
+        cache_ttl: float = 3600.0,
+        failure_ttl: float = 30.0,
+    ):
+        self.hosts = frozenset(host.lower() for host in hosts)
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._failed = TTLCache(maxsize=cache_size, ttl=failure_ttl)
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.requests = 0
+        self.failures = 0
+
+    def is_short_link(self, host: str) -> bool:
+        host = host.lower()
+        if host.startswith("www."):
+            host = host[4:]
+        return host in self.hosts
+
+    def short_links(self, content: str) -> list[str]:
+        return [
+            _split_url(match)[0]
+            for match in URL_PATTERN.finditer(content)
+            if self.is_short_link(match.group("host"))
+        ]
+
+    async def resolve(self, url: str, session: aiohttp.ClientSession) -> str:
+        # Keyed by canonical URL so tracking-parameter variants share an entry.
+        key = canonicalize_url(url)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        if self._failed.get(key) is not None:
+            return url
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            target = await self._follow(url, session)
+            if target is None:
+                self._failed.set(key, True)
+                target = url
+            else:
+                target = canonicalize_url(target)
+                self._cache.set(key, target)
+            future.set_result(target)
+            return target
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # Hand concurrent waiters the same error; mark it retrieved so an
+            # unawaited future doesn't log "exception was never retrieved".
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _follow(self, url: str, session: aiohttp.ClientSession) -> str | None:
+        """The redirect target of `url`, or None if the request failed."""
+        async with self._semaphore:
+            self.requests += 1
+            try:
+                async with session.head(
+                    url,
+                    allow_redirects=True,
+                    max_redirects=self.max_redirects,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                ) as response:
+                    return str(response.url)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.failures += 1
+                logger.warning(f"Failed to resolve short link {url}: {e!r}")
+                return None
+
+    async def expand(self, content: str, session: aiohttp.ClientSession) -> str:
+        """Replace every short link in `content` with its redirect target."""
+        urls = list(dict.fromkeys(self.short_links(content)))
+        if not urls:
+            return content
+        targets = await asyncio.gather(*(self.resolve(url, session) for url in urls))
+        resolved = dict(zip(urls, targets))
+
+        def replace(match: re.Match) -> str:
+            url, trailing = _split_url(match)
+            return resolved.get(url, url) + trailing
+
+        return URL_PATTERN.sub(replace, content)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "inflight": len(self._inflight),
+            **self._cache.stats(),
+        }
+
+
+short_link_resolver = ShortLinkResolver(
+    max_concurrency=int(os.getenv("SHORT_LINK_CONCURRENCY", "8")),
+    timeout=float(os.getenv("SHORT_LINK_TIMEOUT", "5")),
+    failure_ttl=float(os.getenv("SHORT_LINK_FAILURE_TTL", "30")),
+)
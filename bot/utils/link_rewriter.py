@@ -0,0 +1,337 @@
+# bot/utils/link_rewriter.py
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+
+class RewriteEntry(NamedTuple):
+    replacement: str
+    label: str
+    path_prefix: str | None
+    # Subdomains that are fixed too (mobile.twitter.com, old.reddit.com).
+    # Any other subdomain (help.x.com, studio.youtube.com) is left alone.
+    subdomains: frozenset = frozenset()
+    # Matched subdomains carried over to the replacement host, e.g. "vm" for
+    # vm.tiktok.com -> vm.fixtiktok.com. The rest are dropped.
+    keep_subdomains: frozenset = frozenset()
+    # Extra query parameters to drop on top of the label's CANONICAL_RULES.
+    strip_params: frozenset = frozenset()
+
+
+class CanonicalRule(NamedTuple):
+    strip_params: frozenset = frozenset()
+    # (pattern, replacement) pairs applied to the path in order.
+    path_subs: tuple = ()
+
+
+# Dropped from every URL, whatever the platform.
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "igshid", "igsh", "mc_cid", "mc_eid"})
+TRACKING_PARAM_PREFIXES = ("utm_",)
+
+# Per-platform rules, keyed by the `label` used in platform_replacements.
+CANONICAL_RULES = {
+    "Twitter/X": CanonicalRule(frozenset({"s", "t", "ref_src", "ref_url"})),
+    "Youtube": CanonicalRule(frozenset({"si", "feature", "pp"})),
+    "Reddit": CanonicalRule(frozenset({"share_id", "rdt", "ref", "ref_source"})),
+    "Spotify": CanonicalRule(
+        frozenset({"si", "context", "nd", "dlsi"}),
+        ((re.compile(r"^/intl-[a-z]{2}(?:-[a-z]{2})?(?=/)", re.IGNORECASE), ""),),
+    ),
+    "Tiktok": CanonicalRule(
+        frozenset({"_r", "_t", "is_from_webapp", "sender_device", "web_id"})
+    ),
+    "Thread": CanonicalRule(frozenset({"xmt", "slof"})),
+    "Bilibili": CanonicalRule(
+        frozenset({"share_source", "share_medium", "spm_id_from", "vd_source"})
+    ),
+}
+
+
+class DomainTrie:
+    """Domains stored label by label from the TLD down.
+
+    `match("m.youtube.com")` walks com -> youtube -> m and returns the
+    longest configured suffix it passed ("youtube.com"), so lookups cost
+    one step per label however many domains are configured.
+    """
+
+    def __init__(self, domains: dict | None = None):
+        self.root: dict = {}
+        for domain, value in (domains or {}).items():
+            self.add(domain, value)
+
+    def add(self, domain: str, value):
+        node = self.root
+        for label in reversed(domain.lower().split(".")):
+            node = node.setdefault(label, {})
+        node[None] = (domain.lower(), value)
+
+    def match(self, host: str) -> tuple[str, str, object] | None:
+        """Return (subdomain, matched domain, value) for the longest suffix."""
+        labels = host.lower().split(".")
+        node = self.root
+        best = None
+        for i in range(len(labels) - 1, -1, -1):
+            node = node.get(labels[i])
+            if node is None:
+                break
+            if None in node:
+                best = i, node[None]
+        if best is None:
+            return None
+        i, (domain, value) = best
+        return ".".join(labels[:i]), domain, value
+
+
+# Any http(s) URL; the host is resolved through the trie, not the regex.
+URL_PATTERN = re.compile(r"(?P<scheme>https?://)(?P<host>[^\s/?#:]+)(?P<rest>\S*)")
+
+
+class LinkRewriteRules:
+    """A guild's `platform_replacements` + `platforms`, ready to apply.
+
+    Every URL in a message is found by one regex pass and its host looked up
+    in a DomainTrie. A subdomain of a configured domain is only fixed when
+    the entry lists it in `subdomains`, and is dropped from the rewritten
+    host unless it is also in `keep_subdomains`; "www." is always accepted
+    and kept.
+    """
+
+    def __init__(self, entries: dict[str, RewriteEntry]):
+        self.entries = entries
+        self.trie = DomainTrie(entries)
+
+    def rewrite(self, content: str, preserve: bool = False) -> str:
+        return self.fix(content, preserve)[0]
+
+    def fix(self, content: str, preserve: bool = False) -> tuple[str, list[str]]:
+        """Rewritten content plus the fixed links, in the order they appear."""
+        fixed_links = []
+        if not self.entries:
+            return content, fixed_links
+
+        def replace(match: re.Match) -> str:
+            found = self.trie.match(match.group("host"))
+            if found is None:
+                return match.group(0)
+            subdomain, _, entry = found
+            if subdomain and subdomain != "www" and subdomain not in entry.subdomains:
+                return match.group(0)
+            rest, trailing = split_trailing(match.group("rest"))
+            rest = canonicalize_rest(rest, entry.label, entry.strip_params)
+            if entry.path_prefix and not _url_path(rest).startswith(entry.path_prefix):
+                return match.group(0)
+            if subdomain and (subdomain in entry.keep_subdomains or subdomain == "www"):
+                host = f"{subdomain}.{entry.replacement}"
+            else:
+                host = entry.replacement
+            fixed_url = f"{match.group('scheme')}{host}{rest}"
+            if preserve:
+                fixed_url = f"[{entry.label}]({fixed_url})"
+            fixed_links.append(fixed_url)
+            return fixed_url + trailing
+
+        return URL_PATTERN.sub(replace, content), fixed_links
+
+
+class DomainFilter:
+    """Cheap "could this message contain a fixable link?" check.
+
+    Holds the union of every domain seen in any guild's config, compiled
+    into one case-insensitive regex whose alternation is factored into a
+    trie (shared prefixes are matched once), so a miss costs one scan of
+    the message. Domains only match at host-label boundaries, so "x.com"
+    doesn't fire on dropbox.com or x.community. The set only grows; stale
+    domains just cause a slow-path lookup that finds nothing to rewrite.
+    """
+
+    def __init__(self, domains=()):
+        self.domains: set[str] = set()
+        self.pattern = None
+        self.update(domains)
+
+    def update(self, domains) -> bool:
+        new = {domain.lower() for domain in domains if domain} - self.domains
+        if not new:
+            return False
+        self.domains |= new
+        self.pattern = re.compile(
+            rf"(?<![\w-]){_trie_pattern(self.domains)}(?![\w-])", re.IGNORECASE
+        )
+        return True
+
+    def search(self, content: str) -> bool:
+        return self.pattern is not None and self.pattern.search(content) is not None
+
+
+def _trie_pattern(words) -> str:
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _trie_to_regex(trie)
+
+
+def _trie_to_regex(node: dict) -> str:
+    branches = sorted(
+        re.escape(char) + _trie_to_regex(child)
+        for char, child in node.items()
+        if char
+    )
+    if "" in node:
+        # A domain ends here; longer ones sharing the prefix stay optional,
+        # since the trailing boundary no longer lets the shorter one stand in.
+        return "(?:" + "|".join(branches) + ")?" if branches else ""
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+def split_trailing(rest: str) -> tuple[str, str]:
+    """Separate sentence punctuation picked up at the end of a URL."""
+    end = len(rest)
+    while end:
+        char = rest[end - 1]
+        if char in ".,!?;'\"]>":
+            end -= 1
+        elif char == ")" and rest.count("(", 0, end) < rest.count(")", 0, end):
+            # Unbalanced, so it closes text around the link, not the path.
+            end -= 1
+        else:
+            break
+    return rest[:end], rest[end:]
+
+
+def _is_tracking_param(name: str, strip: frozenset) -> bool:
+    name = name.lower()
+    return (
+        name in strip
+        or name in TRACKING_PARAMS
+        or name.startswith(TRACKING_PARAM_PREFIXES)
+    )
+
+
+def canonicalize_rest(
+    rest: str, label: str | None = None, strip_params=frozenset()
+) -> str:
+    """Canonical form of whatever follows the host (port, path, query, fragment).
+
+    Tracking parameters are removed, duplicate slashes collapsed, a trailing
+    slash dropped and the label's path rules applied. The remaining query
+    parameters keep their order and raw encoding.
+    """
+    rule = CANONICAL_RULES.get(label, CanonicalRule())
+    strip = rule.strip_params | strip_params
+
+    rest, _, fragment = rest.partition("#")
+    rest, has_query, query = rest.partition("?")
+    port = ""
+    if rest.startswith(":"):
+        slash = rest.find("/")
+        port, rest = (rest, "") if slash == -1 else (rest[:slash], rest[slash:])
+
+    path = re.sub(r"/{2,}", "/", rest)
+    for pattern, replacement in rule.path_subs:
+        path = pattern.sub(replacement, path)
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    if has_query:
+        params = [
+            param
+            for param in query.split("&")
+            if param and not _is_tracking_param(param.split("=", 1)[0], strip)
+        ]
+        query = "&".join(params)
+
+    canonical = port + path
+    if query:
+        canonical += "?" + query
+    if fragment:
+        canonical += "#" + fragment
+    return canonical
+
+
+def canonicalize_url(url: str, label: str | None = None, strip_params=()) -> str:
+    """Canonical form of `url`, suitable as a cache or stats key.
+
+    Scheme and host are lowercased and everything after the host goes
+    through canonicalize_rest(); `label` selects a CANONICAL_RULES entry.
+    Strings that aren't http(s) URLs are returned unchanged.
+    """
+    match = URL_PATTERN.fullmatch(url.strip())
+    if match is None:
+        return url
+    return (
+        match.group("scheme").lower()
+        + match.group("host").lower()
+        + canonicalize_rest(match.group("rest"), label, frozenset(strip_params))
+    )
+
+
+def _url_path(rest: str) -> str:
+    """Path part of whatever follows the host (port, path, query, fragment)."""
+    path = re.split(r"[?#]", rest, maxsplit=1)[0]
+    if path.startswith(":"):
+        slash = path.find("/")
+        path = path[slash:] if slash != -1 else ""
+    return path
+
+
+def _normalize_entry(entry) -> RewriteEntry | None:
+    if isinstance(entry, dict):
+        replacement = entry.get("replacement")
+        label = entry.get("label")
+        path_prefix = entry.get("path_prefix")
+        subdomains = frozenset(sub.lower() for sub in entry.get("subdomains", ()))
+        keep_subdomains = entry.get("keep_subdomains", ())
+        if keep_subdomains is True:
+            keep_subdomains = subdomains
+        elif not keep_subdomains:
+            keep_subdomains = frozenset()
+        else:
+            keep_subdomains = frozenset(sub.lower() for sub in keep_subdomains)
+        strip_params = frozenset(
+            param.lower() for param in entry.get("strip_params", ())
+        )
+    elif isinstance(entry, (list, tuple)) and len(entry) >= 2:
+        replacement, label = entry[0], entry[1]
+        path_prefix = None
+        subdomains = keep_subdomains = frozenset()
+        strip_params = frozenset()
+    else:
+        return None
+    if not replacement:
+        return None
+    return RewriteEntry(
+        replacement, label, path_prefix, subdomains, keep_subdomains, strip_params
+    )
+
+
+def compile_link_rules(
+    platform_replacements: dict, platforms: dict
+) -> LinkRewriteRules:
+    """Compile the enabled replacements; identical configs share one instance."""
+    entries = []
+    for domain, raw_entry in platform_replacements.items():
+        entry = _normalize_entry(raw_entry)
+        if entry is None or not platforms.get(entry.label, False):
+            continue
+        entries.append((domain.lower(), entry))
+    return _compile(tuple(sorted(entries)))
+
+
+@lru_cache(maxsize=256)
+def _compile(entries: tuple) -> LinkRewriteRules:
+    return LinkRewriteRules(dict(entries))
+
+
+def rewrite_links(
+    content: str, platform_replacements: dict, platforms: dict, preserve: bool = False
+) -> str:
+    """Pure helper: fix every supported link in `content`."""
+    return compile_link_rules(platform_replacements, platforms).rewrite(
+        content, preserve
+    )
@@ -0,0 +1,87 @@
+# bot/utils/permissions.py
+import os
+import time
+from typing import NamedTuple
+
+import discord
+
+from .cache import TTLCache
+from .database import get_config_version, get_guild_data, guilds_collection
+
+
+class GuildRoleSets(NamedTuple):
+    version: tuple
+    loaded_at: float
+    bot_manager_roles: frozenset
+    linkfix_roles: frozenset
+
+
+class PermissionResolver:
+    """Resolves panel/command authorization from cached role sets.
+
+    Each guild's manager and allowed-role IDs are loaded once and kept as
+    frozensets, so a check is a set intersection against the member's cached
+    roles. Entries are rebuilt when the guild's config version changes.
+
+    `bot_manager_role` is stored in the `guilds` collection, which the
+    config version doesn't track and which may be written by other tools,
+    so entries are also rebuilt once they are `manager_role_ttl` seconds
+    old. Call `invalidate()` after changing it from this process.
+    """
+
+    def __init__(
+        self, maxsize: int = 2048, ttl: float = 600.0, manager_role_ttl: float = 60.0
+    ):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.manager_role_ttl = manager_role_ttl
+
+    async def role_sets(self, guild_id: int) -> GuildRoleSets:
+        version = get_config_version(guild_id)
+        cached = self._cache.get(guild_id)
+        if (
+            cached is not None
+            and cached.version == version
+            and time.monotonic() - cached.loaded_at < self.manager_role_ttl
+        ):
+            return cached
+
+        config = await get_guild_data(guild_id, fields=("allowed_roles",))
+        # `bot_manager_role` lives in the separate `guilds` collection.
+        doc = await guilds_collection.find_one(
+            {"guild_id": guild_id}, projection={"_id": 0, "bot_manager_role": 1}
+        )
+        manager_role = doc.get("bot_manager_role") if doc else None
+        role_sets = GuildRoleSets(
+            version=version,
+            loaded_at=time.monotonic(),
+            bot_manager_roles=frozenset([int(manager_role)] if manager_role else ()),
+            linkfix_roles=frozenset(int(r) for r in config.get("allowed_roles", [])),
+        )
+        self._cache.set(guild_id, role_sets)
+        return role_sets
+
+    def invalidate(self, guild_id: int):
+        self._cache.pop(guild_id)
+
+    @staticmethod
+    def has_any_role(member: discord.Member, role_ids: frozenset) -> bool:
+        return bool(role_ids) and not role_ids.isdisjoint(r.id for r in member.roles)
+
+    async def is_bot_manager(self, member: discord.Member) -> bool:
+        if member.guild_permissions.administrator:
+            return True
+        role_sets = await self.role_sets(member.guild.id)
+        return self.has_any_role(member, role_sets.bot_manager_roles)
+
+    async def can_configure_linkfix(self, member: discord.Member) -> bool:
+        if member.guild_permissions.administrator:
+            return True
+        role_sets = await self.role_sets(member.guild.id)
+        return self.has_any_role(member, role_sets.linkfix_roles)
+
+
+permission_resolver = PermissionResolver(
+    maxsize=int(os.getenv("GUILD_CONFIG_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("GUILD_CONFIG_CACHE_TTL", "600")),
+    manager_role_ttl=float(os.getenv("BOT_MANAGER_ROLE_TTL", "60")),
+)
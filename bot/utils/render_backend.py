@@ -0,0 +1,123 @@
+# bot/utils/render_backend.py
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .image_processing import ImageProcessor
+
+logger = logging.getLogger(__name__)
+
+RENDER_BACKENDS = ("thread", "process")
+
+# Set in each worker (or once in this process for the thread backend), so
+# fonts are loaded once per worker rather than once per render.
+_processor: ImageProcessor | None = None
+
+
+def _init_worker():
+    global _processor
+    _processor = ImageProcessor()
+
+
+def _warm_up() -> int:
+    return os.getpid()
+
+
+def _render(
+    banner_bytes: bytes | None,
+    avatar_bytes: bytes | None,
+    display_name: str,
+    username: str,
+    discriminator: str,
+    created_at_str: str,
+    generate_gif: bool,
+) -> bytes | None:
+    buffer = _processor.process_image_sync(
+        io.BytesIO(banner_bytes) if banner_bytes is not None else None,
+        io.BytesIO(avatar_bytes) if avatar_bytes is not None else None,
+        display_name,
+        username,
+        discriminator,
+        created_at_str,
+        generate_gif,
+    )
+    return buffer.getvalue() if buffer else None
+
+
+class RenderBackend:
+    """Runs ImageProcessor.process_image_sync on a thread or process pool.
+
+    With the process backend each worker builds its own ImageProcessor in
+    the pool initializer, and only bytes cross the process boundary.
+    Workers are started with "spawn" so they don't inherit the bot's
+    event loop or driver threads.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 2):
+        if kind not in RENDER_BACKENDS:
+            logger.error(f"Unknown image render backend {kind!r}, using 'thread'.")
+            kind = "thread"
+        self.kind = kind
+        self.workers = workers
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            else:
+                _init_worker()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="render"
+                )
+        return self._executor
+
+    async def start(self):
+        """Create the pool and load fonts in every worker up front."""
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(executor, _warm_up) for _ in range(self.workers))
+        )
+        logger.info(f"Image render backend: {self.kind} ({self.workers} workers)")
+
+    async def render(
+        self,
+        banner_bytes: bytes | None,
+        avatar_bytes: bytes | None,
+        display_name: str,
+        username: str,
+        discriminator: str,
+        created_at_str: str,
+        generate_gif: bool,
+    ) -> bytes | None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            _render,
+            banner_bytes,
+            avatar_bytes,
+            display_name,
+            username,
+            discriminator,
+            created_at_str,
+            generate_gif,
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+render_backend = RenderBackend(
+    kind=os.getenv("IMAGE_RENDER_BACKEND", "thread").lower(),
+    workers=int(os.getenv("IMAGE_RENDER_WORKERS", "2")),
+)
@@ -0,0 +1,203 @@
+# bot/utils/render_cache.py
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Bump when the banner layout changes so old renders stop matching.
+RENDER_TEMPLATE_VERSION = 1
+
+
+def render_key(
+    *,
+    avatar_key: str | None,
+    banner_key: str | None,
+    display_name: str,
+    username: str,
+    discriminator: str,
+    date_text: str,
+    generate_gif: bool,
+    variant: str,
+) -> str:
+    """Content address of a rendered banner.
+
+    `avatar_key`/`banner_key` are Discord asset hashes (or the custom
+    banner URL), so a new avatar or banner produces a new key.
+    """
+    parts = (
+        RENDER_TEMPLATE_VERSION,
+        avatar_key,
+        banner_key,
+        display_name,
+        username,
+        discriminator,
+        date_text,
+        bool(generate_gif),
+        variant,
+    )
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """Rendered banners kept in a memory LRU backed by a capped disk directory.
+
+    Both tiers are bounded in bytes. A disk hit is promoted to memory; when
+    the directory exceeds `disk_budget`, least recently used files (by
+    mtime, refreshed on every hit) are removed.
+    """
+
+    def __init__(self, directory: str, memory_budget: int, disk_budget: int):
+        self.directory = directory
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.render_seconds_saved = 0.0
+        self._render_times: list[float] = []
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.memory_budget:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_budget:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _disk_usage(self) -> int:
+        if self._disk_bytes is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._disk_bytes = sum(
+                entry.stat().st_size
+                for entry in os.scandir(self.directory)
+                if entry.is_file()
+            )
+        return self._disk_bytes
+
+    def _read_disk(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read cached render {path}: {e}")
+            return None
+
+    def _write_disk(self, key: str, data: bytes):
+        if len(data) > self.disk_budget:
+            return
+        try:
+            usage = self._disk_usage()
+            path = self._path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            existing = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._disk_bytes = usage - existing + len(data)
+            if self._disk_bytes > self.disk_budget:
+                self._prune_disk()
+        except OSError as e:
+            logger.warning(f"Failed to write cached render for {key}: {e}")
+
+    def _prune_disk(self):
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        usage = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if usage <= self.disk_budget:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+                usage -= size
+            except OSError:
+                pass
+        self._disk_bytes = usage
+
+    async def get(self, key: str) -> bytes | None:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            self._record_saving(data)
+            return data
+        data = await asyncio.to_thread(self._read_disk, key)
+        if data is not None:
+            self.disk_hits += 1
+            self._remember(key, data)
+            self._record_saving(data)
+            return data
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, data: bytes):
+        self._remember(key, data)
+        await asyncio.to_thread(self._write_disk, key, data)
+
+    async def get_or_render(
+        self, key: str, render: Callable[[], Awaitable[bytes | None]]
+    ) -> bytes | None:
+        """Cached bytes for `key`, or the result of `render()` (then cached)."""
+        data = await self.get(key)
+        if data is not None:
+            return data
+        started = time.perf_counter()
+        data = await render()
+        if data is None:
+            return None
+        self._render_times.append(time.perf_counter() - started)
+        del self._render_times[:-100]
+        await self.set(key, data)
+        return data
+
+    def _record_saving(self, data: bytes):
+        self.bytes_saved += len(data)
+        if self._render_times:
+            self.render_seconds_saved += sum(self._render_times) / len(
+                self._render_times
+            )
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "render_seconds_saved": self.render_seconds_saved,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": self._disk_bytes or 0,
+        }
+
+
+render_cache = RenderCache(
+    directory=os.getenv("RENDER_CACHE_DIR", os.path.join(".cache", "renders")),
+    memory_budget=int(os.getenv("RENDER_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024))),
+    disk_budget=int(os.getenv("RENDER_CACHE_DISK_BYTES", str(256 * 1024 * 1024))),
+)
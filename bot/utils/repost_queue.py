@@ -0,0 +1,161 @@
+# bot/utils/repost_queue.py
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+RepostJob = Callable[[], Awaitable[None]]
+
+
+class TokenBucket:
+    """Allows `capacity` calls at once, refilling at `rate` tokens per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        self._refill()
+        while self.tokens < 1:
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+            self._refill()
+        self.tokens -= 1
+
+
+class ChannelStats:
+    def __init__(self, window: int = 100):
+        self.processed = 0
+        self.failed = 0
+        self.latencies: deque[float] = deque(maxlen=window)
+
+    def snapshot(self, depth: int) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "depth": depth,
+            "processed": self.processed,
+            "failed": self.failed,
+            "avg_latency": sum(latencies) / len(latencies) if latencies else None,
+            "p95_latency": (
+                latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                if latencies
+                else None
+            ),
+        }
+
+
+class RepostQueue:
+    """Ordered, rate-limited repost jobs, one worker per channel.
+
+    Jobs submitted for the same channel run one after another in submit
+    order, each after taking a token from that channel's bucket, so a burst
+    is smoothed out instead of racing into 429s. Workers exit after
+    `idle_timeout` seconds without work and are recreated on demand; an
+    exiting worker also drops its channel's bucket and stats (a bucket idle
+    that long has refilled anyway), folding the counts into the totals.
+    """
+
+    def __init__(
+        self,
+        bucket_capacity: float = 5,
+        bucket_rate: float = 0.5,
+        idle_timeout: float = 60.0,
+    ):
+        self.bucket_capacity = bucket_capacity
+        self.bucket_rate = bucket_rate
+        self.idle_timeout = idle_timeout
+        self._queues: dict[int, asyncio.Queue] = {}
+        self._workers: dict[int, asyncio.Task] = {}
+        self._buckets: dict[int, TokenBucket] = {}
+        self._stats: dict[int, ChannelStats] = {}
+        # Counts from channels whose worker has exited.
+        self._retired_processed = 0
+        self._retired_failed = 0
+
+    def submit(self, channel_id: int, job: RepostJob):
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = self._queues[channel_id] = asyncio.Queue()
+        queue.put_nowait((time.perf_counter(), job))
+        worker = self._workers.get(channel_id)
+        if worker is None or worker.done():
+            self._workers[channel_id] = asyncio.create_task(self._run(channel_id))
+
+    async def _run(self, channel_id: int):
+        queue = self._queues[channel_id]
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = self._buckets[channel_id] = TokenBucket(
+                self.bucket_capacity, self.bucket_rate
+            )
+        stats = self._stats.setdefault(channel_id, ChannelStats())
+        while True:
+            try:
+                enqueued_at, job = await asyncio.wait_for(
+                    queue.get(), timeout=self.idle_timeout
+                )
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    self._queues.pop(channel_id, None)
+                    self._workers.pop(channel_id, None)
+                    self._buckets.pop(channel_id, None)
+                    self._stats.pop(channel_id, None)
+                    self._retired_processed += stats.processed
+                    self._retired_failed += stats.failed
+                    return
+                continue
+            await bucket.acquire()
+            try:
+                await job()
+                stats.processed += 1
+            except Exception as e:
+                stats.failed += 1
+                logger.error(f"Repost in channel {channel_id} failed: {e}")
+            stats.latencies.append(time.perf_counter() - enqueued_at)
+            queue.task_done()
+
+    def depth(self, channel_id: int) -> int:
+        queue = self._queues.get(channel_id)
+        return queue.qsize() if queue else 0
+
+    def stats(self) -> dict[int, dict]:
+        return {
+            channel_id: stats.snapshot(self.depth(channel_id))
+            for channel_id, stats in self._stats.items()
+        }
+
+    def total_stats(self) -> dict:
+        per_channel = self.stats().values()
+        latencies = [
+            latency for stats in self._stats.values() for latency in stats.latencies
+        ]
+        return {
+            "channels": len(self._workers),
+            "depth": sum(s["depth"] for s in per_channel),
+            "processed": self._retired_processed
+            + sum(s["processed"] for s in per_channel),
+            "failed": self._retired_failed + sum(s["failed"] for s in per_channel),
+            "max_latency": max(latencies) if latencies else None,
+        }
+
+    async def close(self, timeout: float = 10.0):
+        """Give queued reposts up to `timeout` seconds to finish, then stop."""
+        pending = [queue.join() for queue in self._queues.values()]
+        if pending:
+            try:
+                await asyncio.wait_for(asyncio.gather(*pending), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Repost queue closed with reposts still pending")
+        for worker in list(self._workers.values()):
+            worker.cancel()
+        self._workers.clear()
+        self._queues.clear()
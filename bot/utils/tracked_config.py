@@ -0,0 +1,142 @@
+# bot/utils/tracked_config.py
+import copy
+
+
+def _path_safe(key) -> bool:
+    return (
+        isinstance(key, str)
+        and key != ""
+        and "." not in key
+        and not key.startswith("$")
+    )
+
+
+def _diff(old: dict, new: dict, prefix: str, sets: dict, unsets: list):
+    for key, value in new.items():
+        if key in old and old[key] == value:
+            continue
+        old_value = old.get(key)
+        if (
+            isinstance(value, dict)
+            and isinstance(old_value, dict)
+            and all(_path_safe(k) for k in value)
+            and all(_path_safe(k) for k in old_value)
+        ):
+            _diff(old_value, value, f"{prefix}{key}.", sets, unsets)
+        else:
+            sets[f"{prefix}{key}"] = copy.deepcopy(value)
+    for key in old:
+        if key not in new:
+            unsets.append(f"{prefix}{key}")
+
+
+class TrackedConfig(dict):
+    """A guild config that remembers how it looked when loaded.
+
+    `changes()` returns only the paths that differ, so saving a single toggle
+    does not rewrite the whole document. Nested dicts are diffed down to
+    their leaves unless a key can't be used in a Mongo path (e.g. the
+    dotted domains in `platform_replacements`), in which case that dict is
+    written as a whole.
+    """
+
+    def __init__(self, snapshot: dict):
+        super().__init__(copy.deepcopy(snapshot))
+        # The snapshot is never mutated, so it can be shared with the cache.
+        self._snapshot = snapshot
+
+    def changes(self) -> tuple[dict, list]:
+        sets, unsets = {}, []
+        _diff(self._snapshot, self, "", sets, unsets)
+        sets.pop("_id", None)
+        if "_id" in unsets:
+            unsets.remove("_id")
+        return sets, unsets
+
+    def mark_saved(self):
+        self._snapshot = copy.deepcopy(dict(self))
+
+
+def _split(path: str) -> tuple[list, str]:
+    *parents, leaf = path.split(".")
+    return parents, leaf
+
+
+def apply_changes(doc: dict, sets: dict, unsets) -> dict:
+    """Return a copy of `doc` with `sets`/`unsets` applied; `doc` is untouched.
+
+    Only the dicts along each changed path are copied, so unchanged parts
+    are shared with the original.
+    """
+    new_doc = dict(doc) if isinstance(doc, dict) else {}
+    for path, value in sets.items():
+        parents, leaf = _split(path)
+        _walk(new_doc, parents, create=True)[leaf] = copy.deepcopy(value)
+    for path in unsets:
+        parents, leaf = _split(path)
+        target = _walk(new_doc, parents, create=False)
+        if target is not None:
+            target.pop(leaf, None)
+    return new_doc
+
+
+def _walk(doc: dict, parents: list, create: bool) -> dict | None:
+    node = doc
+    for key in parents:
+        child = node.get(key)
+        if not isinstance(child, dict):
+            if not create:
+                return None
+            child = {}
+        else:
+            child = dict(child)
+        node[key] = child
+        node = child
+    return node
+
+
+def merge_changes(pending_sets: dict, pending_unsets: set, sets: dict, unsets):
+    """Fold a new batch of changes into pending ones without path conflicts."""
+    for path, value in sets.items():
+        _drop_descendants(pending_sets, pending_unsets, path)
+        ancestor = _find_ancestor(pending_sets, path)
+        if ancestor is not None:
+            rest = path[len(ancestor) + 1 :]
+            pending_sets[ancestor] = apply_changes(
+                pending_sets[ancestor], {rest: value}, ()
+            )
+            continue
+        unset_ancestor = _find_ancestor(pending_unsets, path)
+        if unset_ancestor is not None:
+            # Unset "a" followed by set "a.b" leaves {"b": value} behind.
+            pending_unsets.discard(unset_ancestor)
+            rest = path[len(unset_ancestor) + 1 :]
+            pending_sets[unset_ancestor] = apply_changes({}, {rest: value}, ())
+            continue
+        pending_sets[path] = copy.deepcopy(value)
+
+    for path in unsets:
+        _drop_descendants(pending_sets, pending_unsets, path)
+        ancestor = _find_ancestor(pending_sets, path)
+        if ancestor is not None:
+            rest = path[len(ancestor) + 1 :]
+            pending_sets[ancestor] = apply_changes(pending_sets[ancestor], {}, [rest])
+        elif _find_ancestor(pending_unsets, path) is None:
+            pending_unsets.add(path)
+
+
+def _drop_descendants(pending_sets: dict, pending_unsets: set, path: str):
+    prefix = path + "."
+    for existing in [p for p in pending_sets if p == path or p.startswith(prefix)]:
+        del pending_sets[existing]
+    for existing in [p for p in pending_unsets if p == path or p.startswith(prefix)]:
+        pending_unsets.discard(existing)
+
+
+def _find_ancestor(paths, path: str) -> str | None:
+    parts = path.split(".")
+    for i in range(1, len(parts)):
+        candidate = ".".join(parts[:i])
+        if candidate in paths:
+            return candidate
+    return None
@@ -1,6 +1,7 @@
 import discord
 from discord import ui, Interaction
 from ..utils.database import get_guild_data, update_guild_data
+from ..utils.permissions import permission_resolver
 
 
 class ToggleAutoButton(ui.Button):
@@ -39,6 +40,45 @@ class PreserveLinkButton(ui.Button):
         await self.view.refresh_message(interaction)
 
 
+class ResolveShortLinksButton(ui.Button):
+    def __init__(self):
+        super().__init__(
+            label="短網址展開",
+            style=discord.ButtonStyle.gray,
+            custom_id="toggle_resolve_short_links",
+        )
+
+    async def callback(self, interaction: Interaction):
+        if not await self.view.is_authorized(interaction):
+            return
+        config = await get_guild_data(self.view.guild_id)
+        current = config.get("resolve_short_links", False)
+        await update_guild_data(
+            self.view.guild_id, {"resolve_short_links": not current}
+        )
+        await self.view.refresh_message(interaction)
+
+
+class LinkFixModeButton(ui.Button):
+    def __init__(self):
+        super().__init__(
+            label="修正模式",
+            style=discord.ButtonStyle.gray,
+            custom_id="toggle_link_fix_mode",
+        )
+
+    async def callback(self, interaction: Interaction):
+        if not await self.view.is_authorized(interaction):
+            return
+        config = await get_guild_data(self.view.guild_id)
+        current = config.get("link_fix_mode", "webhook")
+        await update_guild_data(
+            self.view.guild_id,
+            {"link_fix_mode": "reply" if current == "webhook" else "webhook"},
+        )
+        await self.view.refresh_message(interaction)
+
+
 class LinkFixSettingsView(ui.View):
     def __init__(self, bot: discord.Client, guild_id: int):
         super().__init__(timeout=None)
@@ -48,24 +88,20 @@ class LinkFixSettingsView(ui.View):
 
         self.add_item(ToggleAutoButton())
         self.add_item(PreserveLinkButton())
+        self.add_item(ResolveShortLinksButton())
+        self.add_item(LinkFixModeButton())
 
     async def is_authorized(self, interaction: Interaction) -> bool:
-        config = await get_guild_data(self.guild_id)
-        allowed_roles = config.get("allowed_roles", [])
-
-        if interaction.user.guild_permissions.administrator:
+        if await permission_resolver.can_configure_linkfix(interaction.user):
             return True
 
-        if not allowed_roles:
+        role_sets = await permission_resolver.role_sets(self.guild_id)
+        if not role_sets.linkfix_roles:
             await interaction.response.send_message(
                 "❌ 僅限管理員調整設定。", ephemeral=True
             )
             return False
 
-        user_role_ids = [str(r.id) for r in interaction.user.roles]
-        if any(rid in allowed_roles for rid in user_role_ids):
-            return True
-
         await interaction.response.send_message(
             "❌ 你沒有權限調整此設定。", ephemeral=True
         )
@@ -98,6 +134,31 @@ class LinkFixSettingsView(ui.View):
             inline=False,
         )
 
+        embed.add_field(
+            name="短網址展開",
+            value="🟢 啟用（t.co、vm.tiktok.com、redd.it、b23.tv 等）"
+            if config.get("resolve_short_links")
+            else "🔴 停用",
+            inline=False,
+        )
+
+        mode = config.get("link_fix_mode", "webhook")
+        mode_lines = [
+            "🪝 Webhook 轉貼（刪除原訊息）"
+            if mode == "webhook"
+            else "💬 回覆（隱藏原訊息預覽）"
+        ]
+        link_fixer = self.bot.get_cog("LinkFixer")
+        if link_fixer is not None:
+            for name, label in (("webhook", "Webhook"), ("reply", "回覆")):
+                per_link = link_fixer.calls_per_link(name)
+                mode_lines.append(
+                    f"{label}：每個連結 {per_link:.2f} 次 API 呼叫"
+                    if per_link is not None
+                    else f"{label}：尚無資料"
+                )
+        embed.add_field(name="修正模式", value="\n".join(mode_lines), inline=False)
+
         enabled = [key.title() for key, val in platforms.items() if val]
         embed.add_field(
             name="啟用的平台",
@@ -232,6 +293,8 @@ class LinkFixSettingsView(ui.View):
         self.clear_items()
         self.add_item(ToggleAutoButton())
         self.add_item(PreserveLinkButton())
+        self.add_item(ResolveShortLinksButton())
+        self.add_item(LinkFixModeButton())
         await self.add_platform_select()
         await self.add_channel_select(interaction)
         await self.add_role_select(interaction)